@@ -16,7 +16,16 @@ from textwrap import dedent
 from typing import Union
 from webbrowser import open as open_w
 
-from .consts import GIL_SWITCH, IS_WIN, MIGRATION_URI, REQUIREMENTS, RT_DIR, RT_PY
+from .consts import (
+    BACKGROUND_WORKERS,
+    GIL_SWITCH,
+    IS_WIN,
+    JOB_WORKERS,
+    MIGRATION_URI,
+    REQUIREMENTS,
+    RT_DIR,
+    RT_PY,
+)
 
 setswitchinterval(min(getswitchinterval(), GIL_SWITCH))
 
@@ -150,8 +159,18 @@ elif command == "run":
         from .client import ChadClient
 
         nvim = attach("socket", path=args.socket)
-        with ThreadPoolExecutor() as pool:
-            code = run_client(nvim, pool=pool, client=ChadClient(pool=pool))
+        with ThreadPoolExecutor() as pool, ThreadPoolExecutor() as io:
+            with ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS) as background:
+                with ThreadPoolExecutor(max_workers=JOB_WORKERS) as jobs:
+                    with ThreadPoolExecutor(max_workers=1) as reaper:
+                        client = ChadClient(
+                            pool=pool,
+                            io=io,
+                            background=background,
+                            jobs=jobs,
+                            reaper=reaper,
+                        )
+                        code = run_client(nvim, pool=pool, client=client)
         exit(code)
 
 else:
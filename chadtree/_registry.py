@@ -7,6 +7,7 @@ from .transitions import (
     delete,
     filter,
     focus,
+    jobs,
     help,
     new,
     noop,
@@ -14,6 +15,7 @@ from .transitions import (
     quit,
     refresh,
     rename,
+    revalidate,
     resize,
     schedule_update,
     selection,
@@ -22,6 +22,8 @@ from std2.types import AnyFun
 
 from ._registry import ____
 from .consts import RENDER_RETRIES
+from .executors import Background
+from .nvim.layout import invalidate_layout
 from .registry import autocmd, enqueue_event, event_queue, rpc
 from .settings.load import initial as initial_settings
 from .settings.localization import init as init_locale
@@ -30,6 +32,7 @@ from .state.load import initial as initial_state
 from .state.types import State
 from .transitions.autocmds import save_session
 from .transitions.redraw import redraw
+from .transitions.revalidate import revalidate
 from .transitions.schedule_update import schedule_update
 from .transitions.types import Stage
 from .transitions.version_ctl import vc_refresh
@@ -51,8 +54,19 @@ def _profile(nvim: Nvim, t1: float) -> None:
 
 
 class ChadClient(Client):
-    def __init__(self, pool: Executor) -> None:
+    def __init__(
+        self,
+        pool: Executor,
+        io: Executor,
+        background: Executor,
+        jobs: Executor,
+        reaper: Executor,
+    ) -> None:
         self._pool = pool
+        self._io = io
+        self._background = Background(background)
+        self._jobs = jobs
+        self._reaper = Background(reaper)
         self._handlers: MutableMapping[str, RpcCallable] = {}
         self._state: Optional[State] = None
         self._settings: Optional[Settings] = None
@@ -85,10 +99,16 @@ class ChadClient(Client):
                 hl = highlight(*self._settings.view.hl_context.groups)
                 (atomic + autocmd.drain() + hl).commit(nvim)
 
+                init_locale(self._settings.lang)
                 self._state = initial_state(
-                    nvim, pool=self._pool, settings=self._settings
+                    nvim,
+                    pool=self._pool,
+                    io=self._io,
+                    background=self._background,
+                    jobs=self._jobs,
+                    reaper=self._reaper,
+                    settings=self._settings,
                 )
-                init_locale(self._settings.lang)
                 return True
 
         try:
@@ -104,11 +124,12 @@ class ChadClient(Client):
                 t1, has_drawn = monotonic(), False
 
         def sched() -> None:
-            enqueue_event(vc_refresh)
+            enqueue_event(revalidate, background=True)
+            enqueue_event(vc_refresh, background=True)
             for _ in ticker(settings.polling_rate, immediately=False):
-                enqueue_event(schedule_update)
-                enqueue_event(vc_refresh)
-                enqueue_event(save_session)
+                enqueue_event(schedule_update, background=True)
+                enqueue_event(vc_refresh, background=True)
+                enqueue_event(save_session, background=True)
 
         self._pool.submit(sched)
 
@@ -121,10 +142,12 @@ class ChadClient(Client):
 
             def cdraw() -> None:
                 nonlocal has_drawn
+                invalidate_layout()
                 if stage := handler(nvim, self._state, settings, *args):
                     self._state = stage.state
 
                     for _ in range(RENDER_RETRIES - 1):
+                        invalidate_layout()
                         try:
                             redraw(nvim, state=self._state, focus=stage.focus)
                         except NvimError:
@@ -132,6 +155,7 @@ class ChadClient(Client):
                         else:
                             break
                     else:
+                        invalidate_layout()
                         try:
                             redraw(nvim, state=self._state, focus=stage.focus)
                         except NvimError as e:
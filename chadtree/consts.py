@@ -8,7 +8,15 @@ REQUIREMENTS = TOP_LEVEL / "requirements.txt"
 
 
 WALK_PARALLELISM_FACTOR = 100
+BACKGROUND_WORKERS = 2
 RENDER_RETRIES = 3
+FILTER_EXPAND_LIMIT = 100
+PROJECT_INDEX_TTL = 30
+INTERN_LIMIT = 2 ** 20
+JOB_WORKERS = 4
+JOB_REPORT_INTERVAL = 0.5
+OFFLOAD_TIMEOUT = 10
+REAP_WORKERS = 4
 
 FM_FILETYPE = "CHADTree"
 FM_NAMESPACE = "chadtree_ns"
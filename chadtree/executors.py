@@ -0,0 +1,97 @@
+from concurrent.futures import Executor, Future
+from threading import Event, Lock
+from time import monotonic
+from typing import Any, Callable, MutableMapping, Tuple
+
+
+class Background:
+    """
+    Low priority lane, on its own workers so it never holds up interactive work
+
+    A job submitted under the key of a job that has not started yet replaces it
+    """
+
+    def __init__(self, pool: Executor) -> None:
+        self._pool = pool
+        self._lock = Lock()
+        self._queued: MutableMapping[str, Future] = {}
+
+    def submit(self, key: str, fn: Callable[[], Any]) -> Future:
+        def cont() -> Any:
+            with self._lock:
+                if self._queued.get(key) is fut:
+                    self._queued.pop(key)
+            return fn()
+
+        with self._lock:
+            if prev := self._queued.get(key):
+                prev.cancel()
+            fut = self._pool.submit(cont)
+            self._queued[key] = fut
+            return fut
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Job:
+    """
+    Progress + cancellation, shared between a long file operation and the UI
+
+    `on_progress` is throttled to once every `interval` seconds
+
+    Cancelling only stops items that have not started yet, a job is done once
+    every item it added is, cancelled or not
+    """
+
+    def __init__(
+        self, name: str, on_progress: Callable[[], None], interval: float
+    ) -> None:
+        self.name = name
+        self._on_progress = on_progress
+        self._interval = interval
+        self._lock = Lock()
+        self._cancelled = Event()
+        self._reported = monotonic()
+        self._total = 0
+        self._done = 0
+        self._bytes = 0
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self) -> None:
+        """
+        Call before starting an item
+        """
+
+        if self._cancelled.is_set() and not self.done():
+            raise Cancelled(self.name)
+
+    def done(self) -> bool:
+        with self._lock:
+            return bool(self._total) and self._done >= self._total
+
+    def add(self, total: int) -> None:
+        with self._lock:
+            self._total += total
+
+    def advance(self, size: int = 0) -> None:
+        with self._lock:
+            self._done += 1
+            self._bytes += size
+            now = monotonic()
+            report = now - self._reported >= self._interval
+            if report:
+                self._reported = now
+        if report:
+            self._on_progress()
+
+    def progress(self) -> Tuple[int, int, int]:
+        """
+        -> done, total, bytes
+        """
+
+        with self._lock:
+            return self._done, self._total, self._bytes
@@ -1,7 +1,10 @@
 from concurrent.futures import Executor, wait
 from contextlib import suppress
 from fnmatch import fnmatch
-from os import listdir, stat
+from enum import IntEnum, auto
+from heapq import nsmallest
+from locale import strxfrm
+from os import DirEntry, scandir, stat
 from pathlib import PurePath
 from queue import SimpleQueue
 from stat import (
@@ -18,20 +21,28 @@ from stat import (
 )
 from typing import (
     AbstractSet,
+    Any,
+    Callable,
     Iterable,
     Iterator,
     Mapping,
     MutableMapping,
     Optional,
+    Sequence,
+    Tuple,
     cast,
 )
 
 from std2.itertools import chunk
+from std2.pathlib import is_relative_to
+from std2.types import never
 
 from ..consts import WALK_PARALLELISM_FACTOR
+from ..state.trie import PathTrie
 from ..state.types import Index
-from .ops import ancestors
-from .types import Ignored, Mode, Node
+from ..view.types import Sortby
+from .ops import ancestors, child, exists, intern
+from .types import Ignored, Mode, Node, Paging
 
 _FILE_MODES: Mapping[int, Mode] = {
     S_IEXEC: Mode.executable,
@@ -56,56 +67,141 @@ def _fs_modes(stat: int) -> Iterator[Mode]:
             yield mode
 
 
-def _fs_stat(path: PurePath) -> AbstractSet[Mode]:
+def _fs_stat(path: PurePath) -> Tuple[AbstractSet[Mode], int]:
+    """
+    -> modes, mtime of the link target if any
+    """
+
     try:
         info = stat(path, follow_symlinks=False)
     except FileNotFoundError:
-        return {Mode.orphan_link}
+        return {Mode.orphan_link}, 0
     else:
         if S_ISLNK(info.st_mode):
             try:
                 link_info = stat(path, follow_symlinks=True)
             except (FileNotFoundError, NotADirectoryError):
-                return {Mode.orphan_link}
+                return {Mode.orphan_link}, info.st_mtime_ns
             else:
                 mode = {*_fs_modes(link_info.st_mode)}
-                return mode | {Mode.link}
+                return mode | {Mode.link}, link_info.st_mtime_ns
         else:
             mode = {*_fs_modes(info.st_mode)}
-            return mode
+            return mode, info.st_mtime_ns
 
 
-def user_ignored(node: Node, ignores: Ignored) -> bool:
+def path_ignored(path: PurePath, ignores: Ignored) -> bool:
     return (
-        node.path.name in ignores.name_exact
-        or any(fnmatch(node.path.name, pattern) for pattern in ignores.name_glob)
-        or any(fnmatch(str(node.path), pattern) for pattern in ignores.path_glob)
+        path.name in ignores.name_exact
+        or any(fnmatch(path.name, pattern) for pattern in ignores.name_glob)
+        or any(fnmatch(str(path), pattern) for pattern in ignores.path_glob)
     )
 
 
-def _listdir(path: PurePath) -> Iterator[PurePath]:
-    with suppress(NotADirectoryError):
-        yield from map(PurePath, listdir(path))
+def user_ignored(node: Node, ignores: Ignored) -> bool:
+    return path_ignored(node.path, ignores=ignores)
+
+
+class _CompVals(IntEnum):
+    FOLDER = auto()
+    FILE = auto()
+
+
+def sort_key(sort_by: Sequence[Sortby]) -> Callable[[str, bool], Tuple[Any, ...]]:
+    """
+    Sort by name + is folder, so listings can be ordered before anything is stat'ed
+    """
+
+    def key(name: str, folder: bool) -> Tuple[Any, ...]:
+        def cont() -> Iterator[Any]:
+            for sb in sort_by:
+                if sb is Sortby.is_folder:
+                    yield _CompVals.FOLDER if folder else _CompVals.FILE
+                elif sb is Sortby.ext:
+                    yield "" if folder else strxfrm(PurePath(name).suffix)
+                elif sb is Sortby.file_name:
+                    yield strxfrm(name)
+                else:
+                    never(sb)
+
+        return tuple(cont())
+
+    return key
+
+
+def _is_dir(entry: DirEntry) -> bool:
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+def _listdir(path: PurePath, paging: Paging) -> Tuple[Sequence[PurePath], int]:
+    """
+    -> first page(s) of entries in sort order, number of visible entries left out
+
+    Hidden entries do not take up room on a page, the ones that sort before the
+    end of it are kept, so the listing is still a prefix of the full folder
+    """
+
+    limit = paging.size * paging.pages.get(path, 1)
+    ignores = paging.ignores
+    try:
+        entries = scandir(path)
+    except NotADirectoryError:
+        return (), 0
+    else:
+        with entries:
+            if not limit:
+                return tuple(child(path, entry.name) for entry in entries), 0
+            else:
+                listed = tuple((entry.name, _is_dir(entry)) for entry in entries)
+
+    hidden = (
+        {name for name, _ in listed if path_ignored(child(path, name), ignores)}
+        if ignores
+        else set()
+    )
+    visible = tuple(e for e in listed if e[0] not in hidden)
+    if len(visible) <= limit:
+        return tuple(child(path, name) for name, _ in listed), 0
+    else:
+        page = nsmallest(limit, visible, key=lambda e: paging.key(*e))
+        last = paging.key(*page[-1])
+        before = (e for e in listed if e[0] in hidden and paging.key(*e) < last)
+        shown = (*page, *before)
+        return tuple(child(path, name) for name, _ in shown), len(visible) - len(page)
 
 
 def _new(
-    roots: Iterable[PurePath], index: Index, acc: SimpleQueue, bfs_q: SimpleQueue
+    roots: Iterable[PurePath],
+    index: Index,
+    paging: Paging,
+    acc: SimpleQueue,
+    bfs_q: SimpleQueue,
 ) -> None:
     for root in roots:
         with suppress(PermissionError):
-            mode = _fs_stat(root)
+            mode, mtime = _fs_stat(root)
             _ancestors = ancestors(root)
+            children: Sequence[PurePath] = ()
+            truncated = 0
+            if root in index:
+                # unreadable / vanished folder -> still shown, with nothing under it
+                with suppress(OSError):
+                    children, truncated = _listdir(root, paging=paging)
+
             node = Node(
                 path=root,
                 mode=mode,
                 ancestors=_ancestors,
+                mtime=mtime,
+                truncated=truncated,
             )
             acc.put(node)
 
-            if root in index:
-                for item in _listdir(root):
-                    path = root / item
-                    bfs_q.put(path)
+            for path in children:
+                bfs_q.put(path)
 
 
 def _join(nodes: SimpleQueue) -> Node:
@@ -131,7 +227,7 @@ def _join(nodes: SimpleQueue) -> Node:
         return root_node
 
 
-def new(pool: Executor, root: PurePath, index: Index) -> Node:
+def new(pool: Executor, root: PurePath, index: Index, paging: Paging) -> Node:
     acc: SimpleQueue = SimpleQueue()
     bfs_q: SimpleQueue = SimpleQueue()
 
@@ -139,10 +235,12 @@ def new(pool: Executor, root: PurePath, index: Index) -> Node:
         while not bfs_q.empty():
             yield bfs_q.get()
 
-    bfs_q.put(root)
+    bfs_q.put(intern(root))
     while not bfs_q.empty():
         tasks = tuple(
-            pool.submit(_new, roots=paths, index=index, acc=acc, bfs_q=bfs_q)
+            pool.submit(
+                _new, roots=paths, index=index, paging=paging, acc=acc, bfs_q=bfs_q
+            )
             for paths in chunk(drain(), n=WALK_PARALLELISM_FACTOR)
         )
         wait(tasks)
@@ -150,32 +248,179 @@ def new(pool: Executor, root: PurePath, index: Index) -> Node:
     return _join(acc)
 
 
+def shallow(path: PurePath, index: Index, paging: Paging) -> Node:
+    """
+    Only list `path` itself, expanded sub-folders are left pending
+    """
+
+    mode, mtime = _fs_stat(path)
+    children: MutableMapping[PurePath, Node] = {}
+    truncated = 0
+    if path in index:
+        with suppress(OSError):
+            listing, truncated = _listdir(path, paging=paging)
+            for item in listing:
+                with suppress(PermissionError):
+                    c_mode, c_mtime = _fs_stat(item)
+                    children[item] = Node(
+                        path=item,
+                        mode=c_mode,
+                        ancestors=ancestors(item),
+                        mtime=c_mtime,
+                        pending=item in index and Mode.folder in c_mode,
+                    )
+
+    return Node(
+        path=path,
+        mode=mode,
+        ancestors=ancestors(path),
+        mtime=mtime,
+        truncated=truncated,
+        children=children,
+    )
+
+
+def _pending(root: Node) -> Iterator[Node]:
+    if root.pending:
+        yield root
+    else:
+        for child in root.children.values():
+            yield from _pending(child)
+
+
+def graft(root: Node, listed: Mapping[PurePath, Node]) -> Node:
+    if node := listed.get(root.path):
+        return node
+    else:
+        children = {k: graft(v, listed=listed) for k, v in root.children.items()}
+        return Node(
+            path=root.path,
+            mode=root.mode,
+            ancestors=root.ancestors,
+            mtime=root.mtime,
+            pending=root.pending,
+            truncated=root.truncated,
+            children=children,
+        )
+
+
+def has_pending(root: Node) -> bool:
+    return next(_pending(root), None) is not None
+
+
+def stream(
+    pool: Executor, root: Node, index: Index, paging: Paging
+) -> Iterator[Node]:
+    """
+    Fill in pending folders, one level of expanded folders at a time
+    """
+
+    def cont(path: PurePath) -> Node:
+        return shallow(path, index=index, paging=paging)
+
+    while pending := tuple(node.path for node in _pending(root)):
+        listed = {node.path: node for node in pool.map(cont, pending)}
+        root = graft(root, listed=listed)
+        yield root
+
+
 def _update(
-    pool: Executor, root: Node, index: Index, paths: AbstractSet[PurePath]
+    pool: Executor,
+    root: Node,
+    index: Index,
+    paging: Paging,
+    paths: AbstractSet[PurePath],
 ) -> Node:
     if root.path in paths:
-        return new(pool, root=root.path, index=index)
+        return new(pool, root=root.path, index=index, paging=paging)
     else:
         children = {
-            k: _update(pool, root=v, index=index, paths=paths)
+            k: _update(pool, root=v, index=index, paging=paging, paths=paths)
             for k, v in root.children.items()
         }
         return Node(
             path=root.path,
             mode=root.mode,
             ancestors=root.ancestors,
+            mtime=root.mtime,
+            pending=root.pending,
+            truncated=root.truncated,
             children=children,
         )
 
 
 def update(
-    pool: Executor, root: Node, *, index: Index, paths: AbstractSet[PurePath]
+    pool: Executor,
+    root: Node,
+    *,
+    index: Index,
+    paging: Paging,
+    paths: AbstractSet[PurePath],
 ) -> Node:
     try:
-        return _update(pool, root=root, index=index, paths=paths)
+        return _update(pool, root=root, index=index, paging=paging, paths=paths)
     except FileNotFoundError:
-        return new(pool, root=root.path, index=index)
+        return new(pool, root=root.path, index=index, paging=paging)
 
 
 def is_dir(node: Node) -> bool:
     return Mode.folder in node.mode
+
+
+def _witnessed(
+    root: Node, index: Index, path: PurePath, follow: bool
+) -> Optional[bool]:
+    """
+    Look `path` up in a freshly walked tree
+
+    -> None when none of its parents were (fully) listed by the walk
+    """
+
+    if not is_relative_to(path, root.path):
+        return None
+    else:
+        node = root
+        for part in path.relative_to(root.path).parts:
+            if not is_dir(node):
+                return False
+            elif node.path not in index:
+                return None
+            else:
+                nxt = node.children.get(child(node.path, part))
+                if not nxt:
+                    return None if node.truncated else False
+                else:
+                    node = nxt
+
+        return not follow or Mode.orphan_link not in node.mode
+
+
+def surviving(
+    root: Node, index: Index, paths: AbstractSet[PurePath], follow: bool
+) -> AbstractSet[PurePath]:
+    """
+    `paths` that still exist, according to the walk that produced `root`
+
+    -> falls back to `stat` for paths outside of the walk,
+    for an index nothing under a missing folder is checked
+    """
+
+    def keep(path: PurePath) -> bool:
+        seen = _witnessed(root, index=index, path=path, follow=follow)
+        return seen if seen is not None else exists(path, follow=follow)
+
+    if isinstance(paths, PathTrie):
+        return paths.prune(keep)
+    else:
+        return {path for path in paths if keep(path)}
+
+
+def listed(root: Node, index: Index) -> Iterator[Node]:
+    """
+    Folders whose children were read by the walk, parents first
+    """
+
+    if is_dir(root) and root.path in index and not root.pending:
+        yield root
+        for child in root.children.values():
+            yield from listed(child, index=index)
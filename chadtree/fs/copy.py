@@ -0,0 +1,325 @@
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from errno import EBADF, EINVAL, ENOSYS, ENOTSUP, ENOTTY, EOPNOTSUPP, EXDEV
+from os import O_CREAT, O_EXCL, O_RDONLY, O_WRONLY, DirEntry, close, mkdir
+from os import open as os_open
+from os import read, readlink, scandir, stat, symlink, write
+from pathlib import PurePath
+from shutil import Error, SpecialFileError, copystat
+from stat import S_IMODE, S_ISDIR, S_ISFIFO, S_ISLNK, S_ISREG, S_ISSOCK
+from sys import platform
+from typing import Callable, Mapping, MutableSequence, Optional, Sequence, Tuple
+
+from ..executors import Job
+
+_FICLONE = 0x40049409
+_CHUNK = 2 ** 30
+_BUF_SIZE = 2 ** 20
+
+# Syscall not there / not possible between these two files -> try the next one
+_UNSUPPORTED = {EBADF, EINVAL, ENOSYS, ENOTSUP, ENOTTY, EOPNOTSUPP, EXDEV}
+
+_Pairs = Sequence[Tuple[PurePath, PurePath]]
+_Failed = Tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class _Plan:
+    """
+    dirs -> parents first
+    links -> the items being copied, and links inside trees that lead nowhere
+    fifos -> re-created empty, sockets are left out, they mean nothing unbound
+    errors -> folders that could not be listed, same shape as `shutil.Error`
+    """
+
+    dirs: _Pairs
+    files: _Pairs
+    links: _Pairs
+    fifos: _Pairs
+    errors: Sequence[_Failed]
+
+
+def _unsupported(e: OSError) -> bool:
+    return e.errno in _UNSUPPORTED
+
+
+try:
+    from fcntl import ioctl
+
+    def _clone(src: int, dst: int) -> bool:
+        """
+        Reflink, shares extents on btrfs / xfs / bcachefs etc
+        """
+
+        try:
+            ioctl(dst, _FICLONE, src)
+        except OSError as e:
+            if _unsupported(e):
+                return False
+            else:
+                raise
+        else:
+            return True
+
+except ImportError:
+
+    def _clone(src: int, dst: int) -> bool:
+        return False
+
+
+try:
+    from os import copy_file_range
+
+    def _copy_range(src: int, dst: int, size: int) -> bool:
+        """
+        In kernel copy, may still reflink / server side copy on some filesystems
+        """
+
+        copied = 0
+        while True:
+            try:
+                n = copy_file_range(src, dst, _CHUNK)
+            except OSError as e:
+                if not copied and _unsupported(e):
+                    return False
+                else:
+                    raise
+            else:
+                if not n:
+                    return bool(copied) and copied >= size
+                else:
+                    copied += n
+
+except ImportError:
+
+    def _copy_range(src: int, dst: int, size: int) -> bool:
+        return False
+
+
+if platform == "linux":
+    from os import sendfile
+
+    def _send(src: int, dst: int, size: int) -> bool:
+        """
+        Linux only, elsewhere the destination has to be a socket
+        """
+
+        copied = 0
+        while True:
+            try:
+                n = sendfile(dst, src, None, _CHUNK)
+            except OSError as e:
+                if not copied and _unsupported(e):
+                    return False
+                else:
+                    raise
+            else:
+                if not n:
+                    return bool(copied) and copied >= size
+                else:
+                    copied += n
+
+else:
+
+    def _send(src: int, dst: int, size: int) -> bool:
+        return False
+
+
+def _buffered(src: int, dst: int) -> None:
+    while buf := read(src, _BUF_SIZE):
+        view = memoryview(buf)
+        while view:
+            view = view[write(dst, view) :]
+
+
+def _copy_file(src: PurePath, dst: PurePath) -> int:
+    """
+    reflink -> copy_file_range -> sendfile -> read / write, then metadata
+
+    `copy_file_range` / `sendfile` return 0 at EOF, which is also all they do
+    for some virtual files, so nothing copied falls through to the buffered copy
+    """
+
+    info = stat(src)
+    if not S_ISREG(info.st_mode):
+        raise SpecialFileError(src)
+    else:
+        src_fd = os_open(src, O_RDONLY)
+        try:
+            dst_fd = os_open(dst, O_WRONLY | O_CREAT | O_EXCL, S_IMODE(info.st_mode))
+            try:
+                if not (
+                    _clone(src_fd, dst_fd)
+                    or _copy_range(src_fd, dst_fd, size=info.st_size)
+                    or _send(src_fd, dst_fd, size=info.st_size)
+                ):
+                    _buffered(src_fd, dst_fd)
+            finally:
+                close(dst_fd)
+        finally:
+            close(src_fd)
+
+        copystat(src, dst)
+        return info.st_size
+
+
+def _copy_link(src: PurePath, dst: PurePath) -> int:
+    symlink(readlink(src), dst)
+    copystat(src, dst, follow_symlinks=False)
+    return 0
+
+
+try:
+    from os import mkfifo
+
+    def _copy_fifo(src: PurePath, dst: PurePath) -> int:
+        mkfifo(dst, S_IMODE(stat(src).st_mode))
+        copystat(src, dst)
+        return 0
+
+except ImportError:
+
+    def _copy_fifo(src: PurePath, dst: PurePath) -> int:
+        raise SpecialFileError(src)
+
+
+def _mode(entry: DirEntry) -> int:
+    """
+    Links are followed, only the ones that lead nowhere are seen as links
+    """
+
+    try:
+        return entry.stat().st_mode
+    except FileNotFoundError:
+        return entry.stat(follow_symlinks=False).st_mode
+
+
+def _scan(src: PurePath, dst: PurePath) -> _Plan:
+    """
+    -> one level, `dirs` being the folders right under `src`
+
+    Links inside a tree are followed, same as `copytree(symlinks=False)`
+    """
+
+    dirs: MutableSequence[Tuple[PurePath, PurePath]] = []
+    files: MutableSequence[Tuple[PurePath, PurePath]] = []
+    links: MutableSequence[Tuple[PurePath, PurePath]] = []
+    fifos: MutableSequence[Tuple[PurePath, PurePath]] = []
+    errors: MutableSequence[_Failed] = []
+    try:
+        with scandir(src) as entries:
+            for entry in entries:
+                pair = (src / entry.name, dst / entry.name)
+                try:
+                    mode = _mode(entry)
+                except OSError as e:
+                    errors.append((str(pair[0]), str(pair[1]), str(e)))
+                else:
+                    if S_ISDIR(mode):
+                        dirs.append(pair)
+                    elif S_ISLNK(mode):
+                        links.append(pair)
+                    elif S_ISFIFO(mode):
+                        fifos.append(pair)
+                    elif not S_ISSOCK(mode):
+                        files.append(pair)
+    except OSError as e:
+        errors.append((str(src), str(dst), str(e)))
+
+    return _Plan(dirs=dirs, files=files, links=links, fifos=fifos, errors=errors)
+
+
+def _plan(pool: Executor, operations: Mapping[PurePath, PurePath]) -> _Plan:
+    """
+    Walk all the source trees together, one level at a time across the pool
+    """
+
+    dirs: MutableSequence[Tuple[PurePath, PurePath]] = []
+    files: MutableSequence[Tuple[PurePath, PurePath]] = []
+    links: MutableSequence[Tuple[PurePath, PurePath]] = []
+    fifos: MutableSequence[Tuple[PurePath, PurePath]] = []
+    errors: MutableSequence[_Failed] = []
+
+    level: _Pairs = ()
+    for src, dst in operations.items():
+        mode = stat(src, follow_symlinks=False).st_mode
+        if S_ISDIR(mode):
+            level = (*level, (src, dst))
+        elif S_ISLNK(mode):
+            links.append((src, dst))
+        elif S_ISFIFO(mode):
+            fifos.append((src, dst))
+        else:
+            files.append((src, dst))
+
+    while level:
+        dirs.extend(level)
+        nxt: MutableSequence[Tuple[PurePath, PurePath]] = []
+        for scanned in pool.map(lambda p: _scan(*p), level):
+            nxt.extend(scanned.dirs)
+            files.extend(scanned.files)
+            links.extend(scanned.links)
+            fifos.extend(scanned.fifos)
+            errors.extend(scanned.errors)
+        level = nxt
+
+    return _Plan(dirs=dirs, files=files, links=links, fifos=fifos, errors=errors)
+
+
+def copy_trees(
+    pool: Executor, operations: Mapping[PurePath, PurePath], job: Job
+) -> None:
+    """
+    Folders are all created up front in one pass, so the file copies that fan
+    out over the pool never race on `makedirs`
+
+    Folder metadata goes last, deepest first, so copying into them does not
+    bump their mtime back up
+
+    Like `copytree`, whatever fails is skipped and reported together at the end,
+    as a `shutil.Error`
+    """
+
+    plan = _plan(pool, operations=operations)
+    job.add(len(plan.files) + len(plan.links) + len(plan.fifos))
+    errors: MutableSequence[_Failed] = [*plan.errors]
+
+    for src, dst in plan.dirs:
+        job.check()
+        try:
+            mkdir(dst, mode=S_IMODE(stat(src).st_mode) | 0o700)
+        except OSError as e:
+            errors.append((str(src), str(dst), str(e)))
+
+    def cont(
+        copy: Callable[[PurePath, PurePath], int]
+    ) -> Callable[[Tuple[PurePath, PurePath]], Optional[_Failed]]:
+        def c1(pair: Tuple[PurePath, PurePath]) -> Optional[_Failed]:
+            job.check()
+            src, dst = pair
+            try:
+                size = copy(src, dst)
+            except OSError as e:
+                job.advance()
+                return str(src), str(dst), str(e)
+            else:
+                job.advance(size)
+                return None
+
+        return c1
+
+    for copy, pairs in (
+        (_copy_file, plan.files),
+        (_copy_link, plan.links),
+        (_copy_fifo, plan.fifos),
+    ):
+        errors.extend(e for e in pool.map(cont(copy), pairs) if e)
+
+    for src, dst in reversed(plan.dirs):
+        try:
+            copystat(src, dst)
+        except OSError as e:
+            errors.append((str(src), str(dst), str(e)))
+
+    if errors:
+        raise Error(errors)
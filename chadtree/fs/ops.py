@@ -1,29 +1,101 @@
 from concurrent.futures import Executor
 from dataclasses import dataclass
 from datetime import datetime
-from os import makedirs, readlink
+from os import lstat, makedirs
+from os import mkdir as mk
+from os import readlink
 from os import remove as rm
 from os import stat
 from os.path import isfile
 from pathlib import Path, PurePath
-from shutil import copy2, copytree
 from shutil import move as mv
 from shutil import rmtree
 from stat import S_ISDIR, S_ISLNK, filemode
-from typing import AbstractSet, Iterable, Mapping, Optional
+from typing import (
+    AbstractSet,
+    Iterable,
+    Mapping,
+    MutableMapping,
+    MutableSet,
+    Optional,
+    Tuple,
+)
 
 from std2.stat import RW_R__R__, RWXR_XR_X
 
+from ..consts import INTERN_LIMIT
+from ..executors import Job
+from .copy import copy_trees
+
 _FOLDER_MODE = RWXR_XR_X
 _FILE_MODE = RW_R__R__
 
 
+_PATHS: MutableMapping[PurePath, PurePath] = {}
+_CHILDREN: MutableMapping[Tuple[PurePath, str], PurePath] = {}
+_ANCESTORS: MutableMapping[PurePath, AbstractSet[PurePath]] = {}
+
+
+def intern(path: PurePath) -> PurePath:
+    """
+    Canonical instance of `path`
+
+    Its hash is cached on first use, and set / dict lookups between interned
+    paths stop at the identity check instead of comparing parts
+    """
+
+    if len(_PATHS) > INTERN_LIMIT:
+        _PATHS.clear()
+        _CHILDREN.clear()
+        _ANCESTORS.clear()
+    return _PATHS.setdefault(path, path)
+
+
+def child(parent: PurePath, name: str) -> PurePath:
+    """
+    Interned `parent / name`, without parsing when seen before
+    """
+
+    key = (parent, name)
+    if path := _CHILDREN.get(key):
+        return path
+    else:
+        path = intern(parent / name)
+        _CHILDREN[key] = path
+        return path
+
+
 def ancestors(path: PurePath) -> AbstractSet[PurePath]:
-    return {p for p in PurePath(path).parents}
+    """
+    Memoized, built from the parent's ancestors
+    """
+
+    if (acc := _ANCESTORS.get(path)) is not None:
+        return acc
+    else:
+        parent = intern(PurePath(path).parent)
+        if parent == path:
+            acc = frozenset()
+        else:
+            acc = ancestors(parent) | {parent}
+        _ANCESTORS[intern(path)] = acc
+        return acc
 
 
 def unify_ancestors(paths: AbstractSet[PurePath]) -> AbstractSet[PurePath]:
-    return {p for p in paths if ancestors(p).isdisjoint(paths)}
+    """
+    Sorted by parts, descendants directly follow their ancestor,
+    so each path only needs checking against the last one kept
+    """
+
+    unified: MutableSet[PurePath] = set()
+    kept: Tuple[str, ...] = ()
+    for path in sorted(paths, key=lambda p: p.parts):
+        parts = path.parts
+        if not unified or parts[: len(kept)] != kept:
+            unified.add(path)
+            kept = parts
+    return unified
 
 
 @dataclass(frozen=True)
@@ -61,6 +133,15 @@ except ImportError:
         return str(gid)
 
 
+try:
+    from os import getuid as uid
+
+except ImportError:
+
+    def uid() -> int:
+        return 0
+
+
 def fs_stat(path: PurePath) -> FSstat:
     stats = stat(path, follow_symlinks=False)
     permissions = filemode(stats.st_mode)
@@ -89,6 +170,44 @@ def exists(path: PurePath, follow: bool) -> bool:
         return True
 
 
+def mount_point(path: PurePath) -> PurePath:
+    """
+    Top most ancestor of `path` on the same filesystem
+    """
+
+    dev = lstat(path).st_dev
+    while path.parent != path:
+        try:
+            if lstat(path.parent).st_dev != dev:
+                break
+        except OSError:
+            break
+        path = path.parent
+    return path
+
+
+def private_dir(path: PurePath) -> bool:
+    """
+    Create if missing -> is it a real folder, owned by us
+
+    Not a symlink or anything someone else planted in a shared location
+    """
+
+    try:
+        mk(path, mode=0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return False
+
+    try:
+        stats = lstat(path)
+    except OSError:
+        return False
+    else:
+        return S_ISDIR(stats.st_mode) and stats.st_uid == uid()
+
+
 def is_file(pool: Executor, path: PurePath) -> bool:
     fut = pool.submit(isfile, path)
     return fut.result()
@@ -129,27 +248,30 @@ def _remove(path: PurePath) -> None:
         rm(path)
 
 
-def remove(pool: Executor, paths: Iterable[PurePath]) -> None:
-    tuple(pool.map(_remove, paths))
+def remove(pool: Executor, paths: Iterable[PurePath], job: Job) -> None:
+    def cont(path: PurePath) -> None:
+        job.check()
+        _remove(path)
+        job.advance()
+
+    todo = tuple(paths)
+    job.add(len(todo))
+    tuple(pool.map(cont, todo))
 
 
 def _cut(src: PurePath, dest: PurePath) -> None:
     mv(str(src), str(dest))
 
 
-def cut(pool: Executor, operations: Mapping[PurePath, PurePath]) -> None:
-    _op = lambda op: _cut(*op)
-    tuple(pool.map(_op, operations.items()))
+def cut(pool: Executor, operations: Mapping[PurePath, PurePath], job: Job) -> None:
+    def cont(op: Tuple[PurePath, PurePath]) -> None:
+        job.check()
+        _cut(*op)
+        job.advance()
 
+    job.add(len(operations))
+    tuple(pool.map(cont, operations.items()))
 
-def _copy(src: PurePath, dest: PurePath) -> None:
-    stats = stat(src, follow_symlinks=False)
-    if S_ISDIR(stats.st_mode):
-        copytree(src, dest)
-    else:
-        copy2(src, dest, follow_symlinks=False)
 
-
-def copy(pool: Executor, operations: Mapping[PurePath, PurePath]) -> None:
-    _op = lambda op: _copy(*op)
-    tuple(pool.map(_op, operations.items()))
+def copy(pool: Executor, operations: Mapping[PurePath, PurePath], job: Job) -> None:
+    copy_trees(pool, operations=operations, job=job)
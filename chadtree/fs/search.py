@@ -0,0 +1,407 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum, auto
+from fnmatch import fnmatch, translate
+from heapq import nlargest
+from os import environ, walk
+from pathlib import PurePath
+from re import IGNORECASE, MULTILINE, Pattern, compile, escape
+from shutil import which
+from subprocess import DEVNULL, CalledProcessError, check_output
+from time import monotonic
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ..consts import PROJECT_INDEX_TTL
+from .ops import intern
+from .types import Ignored
+
+_GLOB_CHARS = {"*", "?", "["}
+_REGEX_PREFIX = "/"
+_GIT_LS_CMD = (
+    "git",
+    "--no-optional-locks",
+    "ls-files",
+    "--cached",
+    "--others",
+    "--exclude-standard",
+    "-z",
+)
+_GIT_ENV = {"LC_ALL": "C"}
+_CACHED_PATTERNS = 16
+
+
+@dataclass(frozen=True)
+class Project:
+    """
+    names -> basenames, "\\n" joined, so one regex scan covers the whole project
+    fingerprint -> repo state it was indexed at, `None` outside of a repo
+    """
+
+    root: PurePath
+    paths: Sequence[str]
+    names: str
+    offsets: Sequence[int]
+    fingerprint: Optional[str]
+    indexed_at: float
+
+
+_PROJECTS: MutableMapping[PurePath, Project] = {}
+
+_Names = MutableMapping[str, bool]
+_Hits = Sequence[int]
+_NAMES: "OrderedDict[str, _Names]" = OrderedDict()
+_HITS: MutableMapping[PurePath, Tuple[Project, "OrderedDict[str, _Hits]"]] = {}
+
+
+class Kind(Enum):
+    fuzzy = auto()
+    glob = auto()
+    regex = auto()
+
+
+class _Where(Enum):
+    anywhere = auto()
+    start = auto()
+    end = auto()
+
+
+@dataclass(frozen=True)
+class Matcher:
+    """
+    Compiled once per filter pattern
+
+    literal -> plain string test, decides on its own when `exact`,
+    otherwise only a hit short circuits the regex
+    """
+
+    kind: Kind
+    pattern: str
+    regex: Pattern[str]
+    fold: bool
+    literal: Optional[str]
+    where: _Where
+    exact: bool
+
+    def __call__(self, name: str) -> bool:
+        if self.literal is not None:
+            text = name.casefold() if self.fold else name
+            if self.where is _Where.start:
+                hit = text.startswith(self.literal)
+            elif self.where is _Where.end:
+                hit = text.endswith(self.literal)
+            else:
+                hit = self.literal in text
+            if hit or self.exact:
+                return hit
+
+        if self.kind is Kind.regex:
+            return self.regex.search(name) is not None
+        else:
+            return self.regex.match(name) is not None
+
+
+def compile_matcher(pattern: str) -> Matcher:
+    """
+    `/re` -> regex, `*` / `?` / `[` -> glob, otherwise fuzzy, all smart case
+
+    Fuzzy -> each char in order, `[^\\nc]*c` never backtracks, so a failed line
+    costs one pass, `MULTILINE` lets one scan cover many `\\n` joined names
+
+    Raises `re.error` on an invalid regex
+    """
+
+    fold = not any(c.isupper() for c in pattern)
+    flags = MULTILINE | (IGNORECASE if fold else 0)
+    literal = pattern.casefold() if fold else pattern
+
+    if pattern.startswith(_REGEX_PREFIX):
+        regex = compile(pattern[len(_REGEX_PREFIX) :], flags=flags)
+        return Matcher(
+            kind=Kind.regex,
+            pattern=pattern,
+            regex=regex,
+            fold=fold,
+            literal=None,
+            where=_Where.anywhere,
+            exact=False,
+        )
+    elif not _GLOB_CHARS.isdisjoint(pattern):
+        core = literal.strip("*")
+        lead, trail = literal.startswith("*"), literal.endswith("*")
+        simple = bool(core) and _GLOB_CHARS.isdisjoint(core) and (lead or trail)
+        return Matcher(
+            kind=Kind.glob,
+            pattern=pattern,
+            regex=compile(translate(pattern), flags=flags),
+            fold=fold,
+            literal=core if simple else None,
+            where=(
+                _Where.anywhere
+                if lead and trail
+                else (_Where.end if lead else _Where.start)
+            ),
+            exact=simple,
+        )
+    else:
+        gaps = "".join(f"[^\\n{escape(c)}]*{escape(c)}" for c in pattern)
+        return Matcher(
+            kind=Kind.fuzzy,
+            pattern=pattern,
+            regex=compile(f"^{gaps}", flags=flags),
+            fold=fold,
+            literal=literal,
+            where=_Where.anywhere,
+            exact=len(pattern) == 1,
+        )
+
+
+def _remember(cache: "OrderedDict[str, Any]", pattern: str, value: Any) -> None:
+    cache[pattern] = value
+    cache.move_to_end(pattern)
+    while len(cache) > _CACHED_PATTERNS:
+        cache.popitem(last=False)
+
+
+def _monotonic(pattern: str) -> bool:
+    return not pattern.startswith(_REGEX_PREFIX) and _GLOB_CHARS.isdisjoint(pattern)
+
+
+def _narrower(cache: "OrderedDict[str, Any]", matcher: Matcher) -> Optional[str]:
+    """
+    Longest cached pattern that `matcher` refines
+
+    Extending a fuzzy pattern only ever drops matches, even when an upper case
+    char turns smart case off
+    """
+
+    if matcher.kind is not Kind.fuzzy:
+        return None
+    else:
+        return max(
+            (
+                prev
+                for prev in cache
+                if matcher.pattern.startswith(prev) and _monotonic(prev)
+            ),
+            key=len,
+            default=None,
+        )
+
+
+def _refinements(cache: "OrderedDict[str, Any]", matcher: Matcher) -> Iterator[str]:
+    if matcher.kind is Kind.fuzzy:
+        for prev in cache:
+            if (
+                prev != matcher.pattern
+                and prev.startswith(matcher.pattern)
+                and _monotonic(prev)
+            ):
+                yield prev
+
+
+def cached(matcher: Matcher) -> Callable[[str], bool]:
+    """
+    Results are kept per pattern, a refined pattern only re-tests names the
+    pattern before it matched, a loosened one accepts names its refinements did
+    """
+
+    pattern = matcher.pattern
+    seen: _Names = _NAMES.get(pattern, {})
+    base = _narrower(_NAMES, matcher=matcher)
+    misses = _NAMES[base] if base is not None else {}
+    looser = tuple(_NAMES[prev] for prev in _refinements(_NAMES, matcher=matcher))
+    _remember(_NAMES, pattern=pattern, value=seen)
+
+    def match(name: str) -> bool:
+        if (hit := seen.get(name)) is not None:
+            return hit
+        else:
+            if misses.get(name) is False:
+                hit = False
+            elif any(prev.get(name) for prev in looser):
+                hit = True
+            else:
+                hit = matcher(name)
+            seen[name] = hit
+            return hit
+
+    return match
+
+
+def _ignored(ignores: Ignored, name: str, path: str) -> bool:
+    return (
+        name in ignores.name_exact
+        or any(fnmatch(name, pattern) for pattern in ignores.name_glob)
+        or any(fnmatch(path, pattern) for pattern in ignores.path_glob)
+    )
+
+
+def _git_ls(root: PurePath) -> Sequence[str]:
+    if not which("git"):
+        raise FileNotFoundError("git")
+    else:
+        raw = check_output(
+            _GIT_LS_CMD,
+            stdin=DEVNULL,
+            stderr=DEVNULL,
+            cwd=root,
+            env={**environ, **_GIT_ENV},
+        )
+        return raw.decode("UTF-8", "surrogateescape").split("\0")[:-1]
+
+
+def _os_walk(root: PurePath, ignores: Ignored) -> Iterator[str]:
+    for parent, dirs, files in walk(root):
+        base = PurePath(parent)
+        dirs[:] = (
+            d for d in dirs if not _ignored(ignores, name=d, path=str(base / d))
+        )
+        rel = base.relative_to(root)
+        for name in files:
+            yield (rel / name).as_posix()
+
+
+def _listing(root: PurePath, ignores: Ignored) -> Iterator[str]:
+    """
+    Folders are implied by the files under them, `gitignore` is honoured if
+    `root` is in a repo
+    """
+
+    try:
+        files: Sequence[str] = _git_ls(root)
+    except (OSError, CalledProcessError):
+        files = tuple(_os_walk(root, ignores=ignores))
+
+    seen: MutableMapping[str, None] = {}
+    for path in files:
+        parts = path.split("/")
+        prefix = ""
+        for part in parts[:-1]:
+            prefix = f"{prefix}/{part}" if prefix else part
+            if prefix not in seen:
+                seen[prefix] = None
+                yield prefix
+        yield path
+
+
+def index_project(
+    root: PurePath, ignores: Ignored, fingerprint: Optional[str]
+) -> Project:
+    """
+    The last index is re-used while `fingerprint` holds, but only for so long,
+    files git does not track come and go without moving it
+
+    An ignored folder takes everything under it along, folders are listed
+    before their contents
+    """
+
+    if (
+        (prev := _PROJECTS.get(root))
+        and prev.fingerprint == fingerprint
+        and monotonic() - prev.indexed_at < PROJECT_INDEX_TTL
+    ):
+        return prev
+
+    paths = []
+    dropped: MutableMapping[str, None] = {}
+    for path in _listing(root, ignores=ignores):
+        parent, _, name = path.rpartition("/")
+        if parent in dropped or _ignored(ignores, name=name, path=str(root / path)):
+            dropped[path] = None
+        else:
+            paths.append(path)
+
+    names = "\n".join(path.rpartition("/")[2] for path in paths)
+    offsets = []
+    offset = 0
+    for path in paths:
+        offsets.append(offset)
+        offset += len(path) - path.rfind("/")
+
+    project = Project(
+        root=root,
+        paths=paths,
+        names=names,
+        offsets=offsets,
+        fingerprint=fingerprint,
+        indexed_at=monotonic(),
+    )
+    _PROJECTS[root] = project
+    return project
+
+
+def project(root: PurePath) -> Project:
+    """
+    Last finished index of `root`, possibly stale / empty
+    """
+
+    return _PROJECTS.get(root) or Project(
+        root=root, paths=(), names="", offsets=(), fingerprint=None, indexed_at=0
+    )
+
+
+def _score(name: str, pattern: str) -> Tuple[int, int, int]:
+    """
+    contiguous > prefix > shorter
+    """
+
+    lname, lpattern = name.casefold(), pattern.casefold()
+    return (
+        lpattern in lname,
+        lname.startswith(lpattern),
+        -len(name),
+    )
+
+
+def _hits(project: Project, matcher: Matcher, name: Callable[[int], str]) -> _Hits:
+    """
+    Cached per pattern, for as long as the project index stays the same
+    """
+
+    prev, cache = _HITS.get(project.root, (None, OrderedDict()))
+    if prev is not project:
+        cache = OrderedDict()
+        _HITS[project.root] = (project, cache)
+
+    if (hits := cache.get(matcher.pattern)) is not None:
+        return hits
+    else:
+        if (base := _narrower(cache, matcher=matcher)) is not None:
+            hits = tuple(idx for idx in cache[base] if matcher(name(idx)))
+        elif matcher.kind is Kind.fuzzy:
+            hits = tuple(
+                bisect_right(project.offsets, match.start()) - 1
+                for match in matcher.regex.finditer(project.names)
+            )
+        else:
+            hits = tuple(
+                idx for idx in range(len(project.paths)) if matcher(name(idx))
+            )
+
+        _remember(cache, pattern=matcher.pattern, value=hits)
+        return hits
+
+
+def search(project: Project, matcher: Matcher, limit: int) -> Sequence[PurePath]:
+    """
+    Best `limit` matches by basename, anywhere under the project root
+    """
+
+    def name(idx: int) -> str:
+        return project.paths[idx].rpartition("/")[2]
+
+    def key(idx: int) -> Tuple[int, int, int]:
+        return _score(name(idx), pattern=matcher.pattern)
+
+    hits = _hits(project, matcher=matcher, name=name)
+    top = nlargest(limit, hits, key=key)
+    return tuple(intern(project.root / project.paths[idx]) for idx in top)
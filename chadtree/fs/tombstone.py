@@ -0,0 +1,237 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+from os import O_CREAT, O_EXCL, O_RDONLY, O_WRONLY, SEEK_SET, close, ftruncate
+from os import lseek, lstat
+from os import open as os_open
+from os import read
+from os import remove as rm
+from os import rename, scandir, unlink, write
+from os.path import lexists
+from pathlib import Path, PurePath
+from shutil import rmtree
+from stat import S_ISDIR
+from typing import (
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Sequence,
+    Tuple,
+)
+from uuid import uuid4
+
+from pynvim_pp.logging import log
+
+from ..consts import REAP_WORKERS
+from ..executors import Job
+from .ops import mount_point, private_dir, uid
+
+_TOMBSTONES = "tombstones"
+_RECORDS = "records"
+_GRAVES = "graves"
+_PREFIX = ".~chadtree-"
+_MAX_PATH = 2 ** 16
+
+_GRAVEYARDS: MutableMapping[int, Sequence[PurePath]] = {}
+
+
+try:
+    from fcntl import LOCK_EX, LOCK_NB, flock
+
+    def _lock(fd: int, block: bool) -> bool:
+        """
+        Per open file, so it holds between threads as well as processes, and goes
+        away with the process that took it
+        """
+
+        try:
+            flock(fd, LOCK_EX if block else LOCK_EX | LOCK_NB)
+        except BlockingIOError:
+            return False
+        else:
+            return True
+
+except ImportError:
+
+    def _lock(fd: int, block: bool) -> bool:
+        return True
+
+
+def _records(store: Path) -> Path:
+    return store / _TOMBSTONES / _RECORDS
+
+
+def _graveyards(store: Path, path: PurePath) -> Iterator[PurePath]:
+    """
+    Hidden folder on the same filesystem as `path`, so burying it is a rename
+
+    session store -> root of the mount -> right next to `path`
+    """
+
+    dev = lstat(path.parent).st_dev
+    if (yards := _GRAVEYARDS.get(dev)) is None:
+
+        def cont() -> Iterator[PurePath]:
+            graves = store / _TOMBSTONES / _GRAVES
+            try:
+                graves.mkdir(mode=0o700, parents=True, exist_ok=True)
+                same = lstat(graves).st_dev == dev
+            except OSError:
+                same = False
+            if same:
+                yield graves
+            else:
+                yard = mount_point(path.parent) / f"{_PREFIX}{uid()}"
+                if private_dir(yard):
+                    yield yard
+
+        yards = _GRAVEYARDS[dev] = tuple(cont())
+
+    yield from yards
+    yield path.parent
+
+
+def _rm(path: PurePath) -> None:
+    try:
+        stats = lstat(path)
+    except FileNotFoundError:
+        pass
+    else:
+        if S_ISDIR(stats.st_mode):
+            rmtree(path)
+        else:
+            rm(path)
+
+
+def _bury(store: Path, path: PurePath) -> None:
+    """
+    The record goes down before the rename, a crash in between leaves a record
+    pointing at nothing, never a tombstone nobody knows about
+
+    It stays locked until the rename is done, `reap` skips locked records, and
+    empty ones, in case it gets there between the create and the lock
+    """
+
+    name = uuid4().hex
+    record = _records(store) / name
+    record.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    fd = os_open(record, O_WRONLY | O_CREAT | O_EXCL, 0o600)
+    try:
+        _lock(fd, block=True)
+        for yard in _graveyards(store, path=path):
+            grave = yard / f"{_PREFIX}{name}"
+            ftruncate(fd, 0)
+            lseek(fd, 0, SEEK_SET)
+            write(fd, str(grave).encode("UTF-8", "surrogateescape"))
+            try:
+                rename(path, grave)
+            except OSError:
+                pass
+            else:
+                return
+    finally:
+        close(fd)
+
+    unlink(record)
+    _rm(path)
+
+
+def bury(pool: Executor, store: Path, paths: Iterable[PurePath], job: Job) -> None:
+    """
+    Rename everything out of the way first, the actual `rmtree` happens in `reap`
+    """
+
+    def cont(path: PurePath) -> None:
+        job.check()
+        _bury(store, path=path)
+        job.advance()
+
+    todo = tuple(paths)
+    job.add(len(todo))
+    tuple(pool.map(cont, todo))
+
+
+def _claim(store: Path) -> Mapping[Path, Tuple[int, PurePath]]:
+    """
+    -> {record: (locked fd, grave)}, records held elsewhere are left alone
+    """
+
+    records = _records(store)
+    try:
+        with scandir(records) as entries:
+            names = tuple(entry.name for entry in entries)
+    except OSError:
+        return {}
+
+    claimed: MutableMapping[Path, Tuple[int, PurePath]] = {}
+    for name in names:
+        record = records / name
+        try:
+            fd = os_open(record, O_RDONLY)
+        except OSError:
+            continue
+        else:
+            try:
+                if _lock(fd, block=False) and (data := read(fd, _MAX_PATH)):
+                    grave = PurePath(data.decode("UTF-8", "surrogateescape"))
+                    claimed[record] = (fd, grave)
+                    continue
+            except OSError:
+                pass
+            close(fd)
+    return claimed
+
+
+def _contents(path: PurePath) -> Iterator[PurePath]:
+    try:
+        stats = lstat(path)
+    except OSError:
+        pass
+    else:
+        if S_ISDIR(stats.st_mode):
+            try:
+                with scandir(path) as entries:
+                    names = tuple(entry.name for entry in entries)
+            except OSError:
+                pass
+            else:
+                for name in names:
+                    yield path / name
+
+
+def _try_rm(path: PurePath) -> None:
+    try:
+        _rm(path)
+    except OSError as e:
+        log.warn("%s", e)
+
+
+def reap(store: Path) -> None:
+    """
+    Remove every recorded tombstone, including ones left over by earlier
+    sessions, top level entries are spread over a few workers
+
+    A record only goes once its tombstone is really gone, whatever could not be
+    removed is retried by the next `reap`
+    """
+
+    if claimed := _claim(store):
+        try:
+            graves = tuple(grave for _, grave in claimed.values())
+            with ThreadPoolExecutor(max_workers=REAP_WORKERS) as pool:
+                contents = (p for grave in graves for p in _contents(grave))
+                tuple(pool.map(_try_rm, contents))
+                tuple(pool.map(_try_rm, graves))
+
+            gone = tuple(
+                record for record, (_, grave) in claimed.items() if not lexists(grave)
+            )
+        finally:
+            for fd, _ in claimed.values():
+                close(fd)
+
+        for record in gone:
+            try:
+                unlink(record)
+            except FileNotFoundError:
+                pass
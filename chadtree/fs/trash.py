@@ -0,0 +1,276 @@
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from datetime import datetime
+from os import O_CREAT, O_EXCL, O_WRONLY, close, environ, fsdecode, fsencode
+from os import lstat, makedirs, rename, replace, scandir, walk, write
+from os import open as os_open
+from os import remove as rm
+from os.path import lexists
+from pathlib import Path, PurePath
+from stat import S_ISDIR, S_ISLNK, S_ISVTX
+from sys import platform
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from typing import (
+    AbstractSet,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from urllib.parse import quote_from_bytes, unquote_to_bytes
+
+from ..consts import IS_WIN
+from ..executors import Job
+from .ops import mount_point, private_dir, uid
+
+_NATIVE = not IS_WIN and platform != "darwin"
+_FILES = "files"
+_INFO = "info"
+_SIZES = "directorysizes"
+_SUFFIX = ".trashinfo"
+_MAX_TRIES = 1000
+
+_lock, _sizes_lock = Lock(), Lock()
+_TRASHES: MutableMapping[int, Optional["_Trash"]] = {}
+
+
+@dataclass(frozen=True)
+class _Trash:
+    """
+    top -> `Path=` is relative to it, `None` for the home trash
+    """
+
+    root: PurePath
+    top: Optional[PurePath]
+
+
+@dataclass(frozen=True)
+class Trashed:
+    """
+    leftover -> not on the same filesystem as any usable trash
+    folders -> trashes that gained a folder, for `directory_sizes`
+    """
+
+    leftover: Sequence[PurePath]
+    folders: AbstractSet[PurePath]
+
+
+def _home_trash() -> PurePath:
+    data_home = environ.get("XDG_DATA_HOME") or str(Path.home() / ".local" / "share")
+    return PurePath(data_home) / "Trash"
+
+
+def _usable(root: PurePath) -> bool:
+    try:
+        makedirs(root / _FILES, mode=0o700, exist_ok=True)
+        makedirs(root / _INFO, mode=0o700, exist_ok=True)
+    except OSError:
+        return False
+    else:
+        return True
+
+
+def _top_trash(top: PurePath) -> Optional[_Trash]:
+    """
+    `$top/.Trash/$uid` if the admin set up a sticky `.Trash`, else `$top/.Trash-$uid`
+    """
+
+    shared = top / ".Trash"
+    try:
+        stats = lstat(shared)
+    except OSError:
+        pass
+    else:
+        if (
+            S_ISDIR(stats.st_mode)
+            and not S_ISLNK(stats.st_mode)
+            and stats.st_mode & S_ISVTX
+        ):
+            root = shared / str(uid())
+            if private_dir(root) and _usable(root):
+                return _Trash(root=root, top=top)
+
+    root = top / f".Trash-{uid()}"
+    if private_dir(root) and _usable(root):
+        return _Trash(root=root, top=top)
+    else:
+        return None
+
+
+def _trash_for(dev: int, path: PurePath) -> Optional[_Trash]:
+    """
+    Home trash if `path` is on the same filesystem, otherwise the one at the top of
+    its mount, looked up once per filesystem
+    """
+
+    with _lock:
+        if dev in _TRASHES:
+            return _TRASHES[dev]
+
+    home = _home_trash()
+    try:
+        home_dev = lstat(home).st_dev if _usable(home) else None
+    except OSError:
+        home_dev = None
+
+    trash = (
+        _Trash(root=home, top=None)
+        if home_dev == dev
+        else _top_trash(mount_point(path))
+    )
+    with _lock:
+        _TRASHES[dev] = trash
+    return trash
+
+
+def _info(trash: _Trash, path: PurePath) -> bytes:
+    location = path.relative_to(trash.top) if trash.top else path
+    date = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
+    lines = (
+        b"[Trash Info]",
+        b"Path=" + quote_from_bytes(fsencode(location), safe="/").encode(),
+        b"DeletionDate=" + date.encode(),
+        b"",
+    )
+    return b"\n".join(lines)
+
+
+def _reserve(trash: _Trash, path: PurePath) -> str:
+    """
+    `O_EXCL` on the `.trashinfo` is what makes a name ours, even against other
+    programs trashing into the same folder at the same time
+    """
+
+    info = _info(trash, path=path)
+    for n in range(1, _MAX_TRIES + 1):
+        name = path.name if n == 1 else f"{path.stem}.{n}{path.suffix}"
+        if lexists(trash.root / _FILES / name):
+            continue
+        try:
+            fd = os_open(
+                trash.root / _INFO / f"{name}{_SUFFIX}",
+                O_WRONLY | O_CREAT | O_EXCL,
+                0o600,
+            )
+        except FileExistsError:
+            continue
+        else:
+            try:
+                write(fd, info)
+            finally:
+                close(fd)
+            return name
+
+    raise FileExistsError(path)
+
+
+def _move(trash: _Trash, path: PurePath) -> Optional[bool]:
+    """
+    -> moved a folder, `None` if it could not be renamed at all
+    """
+
+    is_dir = S_ISDIR(lstat(path).st_mode)
+    name = _reserve(trash, path=path)
+    try:
+        rename(path, trash.root / _FILES / name)
+    except OSError:
+        rm(trash.root / _INFO / f"{name}{_SUFFIX}")
+        return None
+    else:
+        return is_dir
+
+
+def trash(pool: Executor, paths: Sequence[PurePath], job: Job) -> Trashed:
+    """
+    freedesktop.org trash, every item is a rename into a trash on its own device
+    """
+
+    job.add(len(paths))
+    if not _NATIVE:
+        return Trashed(leftover=paths, folders=set())
+    else:
+
+        def cont(path: PurePath) -> Tuple[PurePath, Optional[PurePath], bool]:
+            job.check()
+            trash = _trash_for(lstat(path).st_dev, path=path)
+            is_dir = _move(trash, path=path) if trash else None
+            if trash and is_dir is not None:
+                job.advance()
+                return path, trash.root, is_dir
+            else:
+                return path, None, False
+
+        moved = tuple(pool.map(cont, paths))
+        leftover = tuple(path for path, root, _ in moved if not root)
+        folders = {root for _, root, is_dir in moved if root and is_dir}
+        return Trashed(leftover=leftover, folders=folders)
+
+
+def _size(path: PurePath) -> int:
+    def cont() -> Iterator[int]:
+        for parent, dirs, files in walk(path):
+            for name in (*dirs, *files):
+                try:
+                    stats = lstat(PurePath(parent) / name)
+                except OSError:
+                    pass
+                else:
+                    if not S_ISDIR(stats.st_mode):
+                        yield stats.st_size
+
+    return sum(cont())
+
+
+def _read_sizes(path: PurePath) -> Mapping[str, Tuple[int, int]]:
+    """
+    -> {name: (size, mtime)}
+    """
+
+    sizes: MutableMapping[str, Tuple[int, int]] = {}
+    try:
+        lines = Path(path).read_bytes().splitlines()
+    except OSError:
+        return sizes
+
+    for line in lines:
+        size, _, rest = line.partition(b" ")
+        mtime, _, name = rest.partition(b" ")
+        if size.isdigit() and mtime.isdigit() and name:
+            sizes[fsdecode(unquote_to_bytes(name))] = (int(size), int(mtime))
+    return sizes
+
+
+def directory_sizes(root: PurePath) -> None:
+    """
+    Update `$trash/directorysizes`, entries are reused for as long as the
+    `.trashinfo` mtime they were taken at still matches
+    """
+
+    with _sizes_lock:
+        cached = _read_sizes(root / _SIZES)
+
+        def cont() -> Iterator[bytes]:
+            with scandir(root / _FILES) as entries:
+                names = tuple(
+                    entry.name
+                    for entry in entries
+                    if entry.is_dir(follow_symlinks=False)
+                )
+            for name in names:
+                try:
+                    mtime = int(lstat(root / _INFO / f"{name}{_SUFFIX}").st_mtime)
+                except OSError:
+                    continue
+                size, prev = cached.get(name, (0, -1))
+                if prev != mtime:
+                    size = _size(root / _FILES / name)
+                encoded = quote_from_bytes(fsencode(name), safe="")
+                yield f"{size} {mtime} {encoded}\n".encode()
+
+        lines = b"".join(cont())
+        with NamedTemporaryFile(dir=root, prefix=f".{_SIZES}", delete=False) as fd:
+            fd.write(lines)
+        replace(fd.name, root / _SIZES)
@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from enum import IntEnum, auto
 from pathlib import PurePath
-from typing import AbstractSet, Mapping, Sequence
+from typing import AbstractSet, Any, Callable, Mapping, Optional, Sequence, Tuple
 
 
 class Mode(IntEnum):
@@ -31,6 +31,9 @@ class Node:
     mode: AbstractSet[Mode]
     path: PurePath
     ancestors: AbstractSet[PurePath]
+    mtime: int = 0
+    pending: bool = False
+    truncated: int = 0
     children: Mapping[PurePath, Node] = field(default_factory=dict)
 
 
@@ -39,3 +42,17 @@ class Ignored:
     name_exact: AbstractSet[str]
     name_glob: Sequence[str]
     path_glob: Sequence[str]
+
+
+@dataclass(frozen=True)
+class Paging:
+    """
+    size -> entries per page, 0 for no limit
+    pages -> pages shown per folder, 1 if absent
+    ignores -> hidden entries, they do not use up a page, `None` when shown
+    """
+
+    size: int
+    pages: Mapping[PurePath, int]
+    key: Callable[[str, bool], Tuple[Any, ...]]
+    ignores: Optional[Ignored]
@@ -0,0 +1,36 @@
+(function ()
+  local windows = {}
+  for _, win in ipairs(vim.api.nvim_list_wins()) do
+    local row, col = unpack(vim.fn.win_screenpos(win))
+    table.insert(
+      windows,
+      {
+        win = win,
+        buf = vim.api.nvim_win_get_buf(win),
+        tab = vim.api.nvim_win_get_tabpage(win),
+        row = row,
+        col = col,
+        preview = vim.api.nvim_win_get_option(win, "previewwindow")
+      }
+    )
+  end
+
+  local buffers = {}
+  for _, buf in ipairs(vim.api.nvim_list_bufs()) do
+    table.insert(
+      buffers,
+      {
+        buf = buf,
+        name = vim.api.nvim_buf_get_name(buf),
+        filetype = vim.api.nvim_buf_get_option(buf, "filetype"),
+        listed = vim.api.nvim_buf_get_option(buf, "buflisted")
+      }
+    )
+  end
+
+  return {
+    tab = vim.api.nvim_get_current_tabpage(),
+    windows = windows,
+    buffers = buffers
+  }
+end)()
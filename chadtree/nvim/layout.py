@@ -0,0 +1,66 @@
+from pathlib import Path
+from typing import Any, Mapping, MutableSequence, Sequence
+
+from pynvim import Nvim
+from pynvim.api import Buffer, NvimError, Window
+
+from .types import BufInfo, Layout, WinInfo
+
+_LUA = (Path(__file__).resolve(strict=True).parent / "layout.lua").read_text("UTF-8")
+
+_SNAPSHOT: MutableSequence[Layout] = []
+
+
+def _fetch(nvim: Nvim) -> Layout:
+    instructions = (
+        ("nvim_list_wins", ()),
+        ("nvim_list_bufs", ()),
+        ("nvim_call_function", ("luaeval", (_LUA,))),
+    )
+    results, err = nvim.api.call_atomic(instructions)
+    if err:
+        raise NvimError(err)
+    else:
+        wins: Sequence[Window] = results[0]
+        bufs: Sequence[Buffer] = results[1]
+        raw: Mapping[str, Any] = results[2]
+
+    win_lookup = {win.handle: win for win in wins}
+    buf_lookup = {buf.handle: buf for buf in bufs}
+
+    buf_infos = (
+        BufInfo(
+            buf=buf_lookup[info["buf"]],
+            name=info["name"],
+            filetype=info["filetype"],
+            listed=info["listed"],
+        )
+        for info in raw["buffers"]
+    )
+    windows = tuple(
+        WinInfo(
+            win=win_lookup[info["win"]],
+            buf=buf_lookup[info["buf"]],
+            tab=info["tab"],
+            row=info["row"],
+            col=info["col"],
+            preview=info["preview"],
+        )
+        for info in raw["windows"]
+    )
+    buffers = {info.buf: info for info in buf_infos}
+    return Layout(tab=raw["tab"], windows=windows, buffers=buffers)
+
+
+def layout(nvim: Nvim) -> Layout:
+    """
+    Windows + buffers in one RPC, kept until `invalidate_layout`
+    """
+
+    if not _SNAPSHOT:
+        _SNAPSHOT.append(_fetch(nvim))
+    return _SNAPSHOT[-1]
+
+
+def invalidate_layout() -> None:
+    _SNAPSHOT.clear()
@@ -0,0 +1,38 @@
+(function (args)
+  local qf_id, qf_tick = unpack(args)
+  local info = vim.fn.getqflist({id = 0, changedtick = 1})
+
+  local quickfix = nil
+  if info.id ~= qf_id or info.changedtick ~= qf_tick then
+    local counts = {}
+    for _, item in ipairs(vim.fn.getqflist()) do
+      local bufnr = item.bufnr
+      if bufnr ~= 0 then
+        counts[bufnr] = (counts[bufnr] or 0) + 1
+      end
+    end
+
+    quickfix = {}
+    for bufnr, count in pairs(counts) do
+      local name = vim.api.nvim_buf_get_name(bufnr)
+      if name ~= "" then
+        table.insert(quickfix, {name, count})
+      end
+    end
+  end
+
+  local bookmarks = {}
+  for _, mark in ipairs(vim.fn.getmarklist()) do
+    local mark_id = string.sub(mark.mark, 2)
+    if string.match(mark_id, "^%u$") and mark.file then
+      table.insert(bookmarks, {mark_id, vim.fn.fnamemodify(mark.file, ":p")})
+    end
+  end
+
+  return {
+    qf_id = info.id,
+    qf_tick = info.changedtick,
+    quickfix = quickfix,
+    bookmarks = bookmarks
+  }
+end)(...)
@@ -1,44 +1,94 @@
-from collections import Counter
-from itertools import chain
-from pathlib import PurePath
-from typing import AbstractSet, Iterator, Mapping, MutableMapping, MutableSet
+from operator import add, or_
+from pathlib import Path, PurePath
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 from pynvim import Nvim
-from pynvim_pp.api import get_cwd, list_bookmarks
+from pynvim_pp.api import get_cwd
 from pynvim_pp.lib import resolve_path
 
-from ..fs.ops import ancestors
 from .types import Markers
 
+T = TypeVar("T")
 
-def _bookmarks(nvim: Nvim) -> Mapping[PurePath, AbstractSet[str]]:
-    acc: MutableMapping[PurePath, MutableSet[str]] = {}
-    for mark_id, path in list_bookmarks(nvim):
-        for marked_path in chain((path,), ancestors(path)):
-            marks = acc.setdefault(marked_path, set())
-            marks.add(mark_id)
+_LUA = (Path(__file__).resolve(strict=True).parent / "markers.lua").read_text("UTF-8")
+
+
+def _fold_up(
+    leaves: Iterable[Tuple[PurePath, T]], plus: Callable[[T, T], T]
+) -> Mapping[PurePath, T]:
+    """
+    Aggregate up the path trie one level at a time, each ancestor is visited once
+    """
+
+    levels: MutableMapping[int, MutableMapping[PurePath, T]] = {}
+
+    def put(depth: int, path: PurePath, val: T) -> None:
+        level = levels.setdefault(depth, {})
+        level[path] = plus(level[path], val) if path in level else val
+
+    for path, val in leaves:
+        put(len(path.parts), path=path, val=val)
+
+    acc: MutableMapping[PurePath, T] = {}
+    for depth in range(max(levels, default=0), 0, -1):
+        for path, val in levels.get(depth, {}).items():
+            acc[path] = val
+            parent = path.parent
+            if parent != path:
+                put(depth - 1, path=parent, val=val)
 
     return acc
 
 
-def _quickfix(nvim: Nvim) -> Mapping[PurePath, int]:
-    def it() -> Iterator[PurePath]:
-        cwd = get_cwd(nvim)
-        for q in nvim.funcs.getqflist():
-            bufnr = q["bufnr"]
-            bufname = nvim.funcs.bufname(bufnr)
-            if resolved := resolve_path(cwd, path=bufname):
-                yield resolved
+def _resolved(
+    cwd: PurePath, pairs: Iterable[Tuple[str, T]]
+) -> Iterator[Tuple[PurePath, T]]:
+    for name, val in pairs:
+        if path := resolve_path(cwd, path=name):
+            yield path, val
+
+
+def _bookmarks(
+    cwd: PurePath, marks: Iterable[Tuple[str, str]]
+) -> Mapping[PurePath, AbstractSet[str]]:
+    pairs = ((name, frozenset((mark_id,))) for mark_id, name in marks)
+    return _fold_up(_resolved(cwd, pairs=pairs), plus=or_)
+
+
+def _quickfix(
+    cwd: PurePath, counts: Iterable[Tuple[str, int]]
+) -> Mapping[PurePath, int]:
+    return _fold_up(_resolved(cwd, pairs=counts), plus=add)
+
 
-    filenames = tuple(it())
-    parents = (ancestor for fullname in filenames for ancestor in ancestors(fullname))
-    locations = Counter(chain(filenames, parents))
+def markers(nvim: Nvim, prev: Optional[Markers]) -> Markers:
+    """
+    -> `prev` itself if nothing changed
+    """
 
-    return locations
+    cwd = get_cwd(nvim)
+    qf_id, qf_tick = prev.quick_fix_tick if prev else (-1, -1)
+    collected: Mapping[str, Any] = nvim.funcs.luaeval(_LUA, (qf_id, qf_tick))
 
+    qf = collected.get("quickfix")
+    quick_fix = (
+        prev.quick_fix if prev and qf is None else _quickfix(cwd, counts=qf or ())
+    )
+    bookmarks = _bookmarks(cwd, marks=collected["bookmarks"])
 
-def markers(nvim: Nvim) -> Markers:
-    qf = _quickfix(nvim)
-    bm = _bookmarks(nvim)
-    markers = Markers(quick_fix=qf, bookmarks=bm)
-    return markers
+    if prev and quick_fix is prev.quick_fix and bookmarks == prev.bookmarks:
+        return prev
+    else:
+        tick = (collected["qf_id"], collected["qf_tick"])
+        return Markers(quick_fix=quick_fix, quick_fix_tick=tick, bookmarks=bookmarks)
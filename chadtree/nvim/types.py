@@ -1,9 +1,37 @@
 from dataclasses import dataclass
 from pathlib import PurePath
-from typing import AbstractSet, Mapping
+from typing import AbstractSet, Mapping, Sequence, Tuple
+
+from pynvim.api import Buffer, Window
 
 
 @dataclass(frozen=True)
 class Markers:
     quick_fix: Mapping[PurePath, int]
+    quick_fix_tick: Tuple[int, int]
     bookmarks: Mapping[PurePath, AbstractSet[str]]
+
+
+@dataclass(frozen=True)
+class WinInfo:
+    win: Window
+    buf: Buffer
+    tab: int
+    row: int
+    col: int
+    preview: bool
+
+
+@dataclass(frozen=True)
+class BufInfo:
+    buf: Buffer
+    name: str
+    filetype: str
+    listed: bool
+
+
+@dataclass(frozen=True)
+class Layout:
+    tab: int
+    windows: Sequence[WinInfo]
+    buffers: Mapping[Buffer, BufInfo]
@@ -0,0 +1,435 @@
+from atexit import register
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from marshal import dumps, loads
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import PurePath
+from threading import Lock
+from typing import (
+    AbstractSet,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    MutableSequence,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
+
+from pynvim_pp.logging import log
+
+from .consts import OFFLOAD_TIMEOUT
+from .fs.cartographer import graft
+from .fs.cartographer import new as _new
+from .fs.cartographer import sort_key
+from .fs.cartographer import update as _update
+from .fs.ops import ancestors, child, intern
+from .fs.types import Mode, Node, Paging
+from .nvim.types import Markers
+from .settings.localization import init as init_locale
+from .settings.types import Settings
+from .state.types import FilterPattern, Index, Selection
+from .version_ctl.types import VCStatus
+from .view.render import render as _render
+from .view.types import Badge, Derived, Highlight
+
+_Record = Tuple[int, str, int, int, bool, int]
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True)
+class _Context:
+    """
+    Large and rarely replaced, only sent to the worker when one of them is
+    """
+
+    index: Index
+    markers: Markers
+    vc: VCStatus
+
+
+@dataclass(frozen=True)
+class _RenderArgs:
+    selection: Selection
+    filter_pattern: Optional[FilterPattern]
+    show_hidden: bool
+    current: Optional[PurePath]
+
+
+_Shared = Tuple[Node, int, Sequence[Node]]
+_Rendered = Tuple[
+    Sequence[str],
+    Sequence[Sequence[Highlight]],
+    Sequence[Sequence[Badge]],
+    Sequence[str],
+    Sequence[int],
+]
+
+
+def _encode(root: Node) -> Tuple[bytes, Sequence[Node]]:
+    """
+    Flat pre-order list of (parent, name, modes, mtime, pending, truncated)
+
+    -> marshalled list, nodes in the same order
+    """
+
+    nodes: MutableSequence[Node] = []
+    records: MutableSequence[_Record] = []
+
+    def cont(node: Node, parent: int) -> None:
+        idx = len(nodes)
+        name = str(node.path) if parent < 0 else node.path.name
+        modes = sum(1 << mode for mode in node.mode)
+        nodes.append(node)
+        records.append(
+            (parent, name, modes, node.mtime, node.pending, node.truncated)
+        )
+        for sub in node.children.values():
+            cont(sub, parent=idx)
+
+    cont(root, parent=-1)
+    return dumps(tuple(records)), nodes
+
+
+def _decode(data: bytes) -> Tuple[Node, Sequence[Node]]:
+    records: Sequence[_Record] = loads(data)
+
+    paths: MutableSequence[PurePath] = []
+    for parent, name, *_ in records:
+        path = intern(PurePath(name)) if parent < 0 else child(paths[parent], name)
+        paths.append(path)
+
+    children: MutableMapping[int, MutableMapping[PurePath, Node]] = {}
+    nodes: MutableSequence[Optional[Node]] = [None] * len(records)
+    for idx in reversed(range(len(records))):
+        parent, _, modes, mtime, pending, truncated = records[idx]
+        node = Node(
+            path=paths[idx],
+            mode={mode for mode in Mode if modes & (1 << mode)},
+            ancestors=ancestors(paths[idx]),
+            mtime=mtime,
+            pending=pending,
+            truncated=truncated,
+            children=children.pop(idx, {}),
+        )
+        nodes[idx] = node
+        if parent >= 0:
+            children.setdefault(parent, {})[node.path] = node
+
+    decoded = tuple(node for node in nodes if node)
+    return decoded[0], decoded
+
+
+_WORKER: MutableSequence[Tuple[Settings, Executor]] = []
+_ATTACHED: MutableMapping[str, SharedMemory] = {}
+_CONTEXT: MutableSequence[_Context] = []
+
+
+def _worker_init(settings: Settings) -> None:
+    init_locale(settings.lang)
+    _WORKER.append((settings, ThreadPoolExecutor()))
+
+
+def _worker_walk(
+    roots: Sequence[PurePath],
+    index: Index,
+    pages: Mapping[PurePath, int],
+    show_hidden: bool,
+) -> Sequence[bytes]:
+    settings, pool = _WORKER[-1]
+    paging = Paging(
+        size=settings.folder_page_size,
+        pages=pages,
+        key=sort_key(settings.view.sort_by),
+        ignores=None if show_hidden else settings.ignores,
+    )
+
+    def cont() -> Iterator[bytes]:
+        for root in roots:
+            data, _ = _encode(_new(pool, root=root, index=index, paging=paging))
+            yield data
+
+    return tuple(cont())
+
+
+def _render_local(
+    root: Node, settings: Settings, context: _Context, args: _RenderArgs
+) -> Derived:
+    return _render(
+        root,
+        settings=settings,
+        index=context.index,
+        selection=args.selection,
+        filter_pattern=args.filter_pattern,
+        markers=context.markers,
+        vc=context.vc,
+        show_hidden=args.show_hidden,
+        current=args.current,
+    )
+
+
+def _attach(name: str) -> SharedMemory:
+    """
+    Stays attached for as long as the segment is in use, only a new segment is
+    ever attached to, and registered with the resource tracker
+    """
+
+    if not (shm := _ATTACHED.get(name)):
+        for prev in _ATTACHED.values():
+            prev.close()
+        _ATTACHED.clear()
+        shm = _ATTACHED[name] = SharedMemory(name=name)
+    return shm
+
+
+def _worker_render(
+    name: str, size: int, context: Optional[_Context], args: _RenderArgs
+) -> _Rendered:
+    """
+    `context` is `None` when it is the same as last time
+    """
+
+    settings, _ = _WORKER[-1]
+    if context:
+        _CONTEXT[:] = (context,)
+    shm = _attach(name)
+    data = bytes(cast(memoryview, shm.buf)[:size])
+
+    root, nodes = _decode(data)
+    rows = {id(node): idx for idx, node in enumerate(nodes)}
+    derived = _render_local(root, settings=settings, context=_CONTEXT[-1], args=args)
+    return (
+        derived.lines,
+        derived.highlights,
+        derived.badges,
+        derived.hashed,
+        tuple(rows[id(node)] for node in derived.node_row_lookup),
+    )
+
+
+def _result(fut: "Future[_T]") -> _T:
+    try:
+        return fut.result(timeout=OFFLOAD_TIMEOUT)
+    except FutureTimeoutError:
+        fut.cancel()
+        raise
+
+
+def _worker(settings: Settings) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=get_context("spawn"),
+        initializer=_worker_init,
+        initargs=(settings,),
+    )
+
+
+class _Offload:
+    """
+    A worker process for walks and another for renders, so neither waits on
+    the other; the tree being rendered is kept in shared memory, re-encoded
+    only when the tree itself changes
+
+    One segment, re-used until a tree no longer fits, then replaced by a bigger one
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self._walker = _worker(settings)
+        self._renderer = _worker(settings)
+        self._lock = Lock()
+        self._shm: Optional[SharedMemory] = None
+        self._shared: Optional[_Shared] = None
+        self._sent: Optional[_Context] = None
+        register(self.close)
+
+    def _share(self, root: Node) -> Tuple[SharedMemory, int, Sequence[Node]]:
+        if self._shm and self._shared and self._shared[0] is root:
+            _, size, nodes = self._shared
+            return self._shm, size, nodes
+        else:
+            data, nodes = _encode(root)
+            size = len(data)
+            if not self._shm or self._shm.size < size:
+                self._unlink()
+                self._shm = SharedMemory(create=True, size=max(1, size + size // 2))
+            shm = self._shm
+            cast(memoryview, shm.buf)[:size] = data
+            self._shared = (root, size, nodes)
+            return shm, size, nodes
+
+    def _unlink(self) -> None:
+        self._shared = None
+        if shm := self._shm:
+            self._shm = None
+            shm.close()
+            shm.unlink()
+
+    def close(self) -> None:
+        with self._lock:
+            self._unlink()
+        self._walker.shutdown(wait=False)
+        self._renderer.shutdown(wait=False)
+
+    def walk(
+        self,
+        roots: Sequence[PurePath],
+        index: Index,
+        pages: Mapping[PurePath, int],
+        show_hidden: bool,
+    ) -> Sequence[Node]:
+        fut = self._walker.submit(_worker_walk, roots, index, pages, show_hidden)
+        return tuple(_decode(data)[0] for data in _result(fut))
+
+    def render(self, root: Node, context: _Context, args: _RenderArgs) -> Derived:
+        with self._lock:
+            shm, size, nodes = self._share(root)
+            sent = self._sent
+            same = (
+                sent
+                and sent.index is context.index
+                and sent.markers is context.markers
+                and sent.vc is context.vc
+            )
+            fut = self._renderer.submit(
+                _worker_render, shm.name, size, None if same else context, args
+            )
+            self._sent = context
+            try:
+                lines, highlights, badges, hashed, rows = _result(fut)
+            except Exception:
+                self._sent = None
+                raise
+
+        node_row_lookup = tuple(nodes[idx] for idx in rows)
+        path_row_lookup: MutableMapping[PurePath, int] = {}
+        for row, node in enumerate(node_row_lookup):
+            path_row_lookup.setdefault(node.path, row)
+
+        return Derived(
+            lines=lines,
+            highlights=highlights,
+            badges=badges,
+            hashed=hashed,
+            node_row_lookup=node_row_lookup,
+            path_row_lookup=path_row_lookup,
+        )
+
+
+_OFFLOAD: MutableSequence[Optional[_Offload]] = []
+_OFFLOAD_LOCK = Lock()
+
+
+def _offload(settings: Settings) -> Optional[_Offload]:
+    """
+    `None` once a worker has died, everything is done locally from then on
+    """
+
+    if not settings.offload:
+        return None
+    else:
+        with _OFFLOAD_LOCK:
+            if not _OFFLOAD:
+                _OFFLOAD.append(_Offload(settings))
+            return _OFFLOAD[-1]
+
+
+def _failed(e: Exception) -> None:
+    if isinstance(e, BrokenProcessPool):
+        with _OFFLOAD_LOCK:
+            offload = _OFFLOAD[-1] if _OFFLOAD else None
+            _OFFLOAD[:] = (None,)
+        if offload:
+            log.warn("offload worker died, running locally from now on -- %s", e)
+            offload.close()
+    elif isinstance(e, FutureTimeoutError):
+        log.warn("offload timed out after %ss", OFFLOAD_TIMEOUT)
+    else:
+        log.exception("%s", e)
+
+
+def new(
+    pool: Executor, settings: Settings, root: PurePath, index: Index, paging: Paging
+) -> Node:
+    if offload := _offload(settings):
+        try:
+            (node,) = offload.walk(
+                (root,),
+                index=index,
+                pages={**paging.pages},
+                show_hidden=paging.ignores is None,
+            )
+        except Exception as e:
+            _failed(e)
+        else:
+            return node
+
+    return _new(pool, root=root, index=index, paging=paging)
+
+
+def _targets(root: Node, paths: AbstractSet[PurePath]) -> Iterator[PurePath]:
+    if root.path in paths:
+        yield root.path
+    else:
+        for child in root.children.values():
+            yield from _targets(child, paths=paths)
+
+
+def update(
+    pool: Executor,
+    settings: Settings,
+    root: Node,
+    *,
+    index: Index,
+    paging: Paging,
+    paths: AbstractSet[PurePath],
+) -> Node:
+    if offload := _offload(settings):
+        targets = tuple(_targets(root, paths=paths))
+        try:
+            nodes = offload.walk(
+                targets,
+                index=index,
+                pages={**paging.pages},
+                show_hidden=paging.ignores is None,
+            )
+        except Exception as e:
+            _failed(e)
+        else:
+            walked = {node.path: node for node in nodes}
+            return graft(root, listed=walked)
+
+    return _update(pool, root=root, index=index, paging=paging, paths=paths)
+
+
+def render(
+    node: Node,
+    *,
+    settings: Settings,
+    index: Index,
+    selection: Selection,
+    filter_pattern: Optional[FilterPattern],
+    markers: Markers,
+    vc: VCStatus,
+    show_hidden: bool,
+    current: Optional[PurePath],
+) -> Derived:
+    context = _Context(index=index, markers=markers, vc=vc)
+    args = _RenderArgs(
+        selection=selection,
+        filter_pattern=filter_pattern,
+        show_hidden=show_hidden,
+        current=current,
+    )
+    if offload := _offload(settings):
+        try:
+            return offload.render(node, context=context, args=args)
+        except Exception as e:
+            _failed(e)
+
+    return _render_local(node, settings=settings, context=context, args=args)
@@ -1,5 +1,8 @@
-from queue import SimpleQueue
-from typing import Any, Callable
+from enum import IntEnum, auto
+from itertools import count
+from queue import PriorityQueue
+from threading import Lock
+from typing import Any, Callable, MutableSet
 
 from pynvim_pp.autocmd import AutoCMD
 from pynvim_pp.logging import log
@@ -12,15 +15,51 @@ def _name_gen(fn: Callable[[Callable[..., Any]], str]) -> str:
     return fn.__qualname__.lstrip("_").capitalize()
 
 
-event_queue: SimpleQueue = SimpleQueue()
+class _Lane(IntEnum):
+    interactive = auto()
+    background = auto()
+
+
+class _EventQueue:
+    """
+    Interactive events are always served before background ones,
+    a background event is dropped if the same one is still waiting
+    """
+
+    def __init__(self) -> None:
+        self._queue: PriorityQueue = PriorityQueue()
+        self._seq = count()
+        self._lock = Lock()
+        self._waiting: MutableSet[str] = set()
+
+    def put(self, msg: RpcMsg, background: bool = False) -> None:
+        name, _ = msg
+        with self._lock:
+            if background and name in self._waiting:
+                return
+            elif background:
+                self._waiting.add(name)
+            lane = _Lane.background if background else _Lane.interactive
+            self._queue.put((lane, next(self._seq), msg))
+
+    def get(self) -> RpcMsg:
+        lane, _, msg = self._queue.get()
+        if lane is _Lane.background:
+            name, _ = msg
+            with self._lock:
+                self._waiting.discard(name)
+        return msg
+
+
+event_queue = _EventQueue()
 autocmd = AutoCMD()
 rpc = RPC(NAMESPACE, name_gen=_name_gen)
 
 
-def enqueue_event(event: RpcCallable, *args: Any) -> None:
+def enqueue_event(event: RpcCallable, *args: Any, background: bool = False) -> None:
     try:
         msg: RpcMsg = (event.name, args)
-        event_queue.put(msg)
+        event_queue.put(msg, background=background)
     except Exception as e:
         log.exception("%s", e)
         raise
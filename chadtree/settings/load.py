@@ -36,9 +36,11 @@ class _OpenDirection(Enum):
 @dataclass(frozen=True)
 class _UserOptions:
     close_on_open: bool
+    folder_page_size: int
     follow: bool
     lang: Optional[str]
     mimetypes: MimetypeOptions
+    offload: bool
     page_increment: int
     polling_rate: SupportsFloat
     session: bool
@@ -131,11 +133,13 @@ def initial(nvim: Nvim, specs: Sequence[RpcSpec]) -> Settings:
     else:
         settings = Settings(
             close_on_open=options.close_on_open,
+            folder_page_size=options.folder_page_size,
             follow=options.follow,
             ignores=config.ignore,
             keymap=keymap,
             lang=options.lang,
             mime=options.mimetypes,
+            offload=options.offload,
             open_left=view.open_direction is _OpenDirection.left,
             page_increment=options.page_increment,
             polling_rate=float(options.polling_rate),
@@ -8,6 +8,7 @@ from ..view.types import ViewOptions
 @dataclass(frozen=True)
 class VersionCtlOpts:
     enable: bool
+    fast_index: bool
 
 
 @dataclass(frozen=True)
@@ -19,11 +20,13 @@ class MimetypeOptions:
 @dataclass(frozen=True)
 class Settings:
     close_on_open: bool
+    folder_page_size: int
     follow: bool
     ignores: Ignored
     keymap: Mapping[str, AbstractSet[str]]
     lang: Optional[str]
     mime: MimetypeOptions
+    offload: bool
     open_left: bool
     page_increment: int
     polling_rate: float
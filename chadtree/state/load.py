@@ -5,26 +5,41 @@ from pynvim import Nvim
 from pynvim_pp.api import get_cwd
 
 from ..consts import SESSION_DIR
-from ..fs.cartographer import new
+from ..executors import Background
+from ..fs.cartographer import shallow
+from ..fs.tombstone import reap
 from ..nvim.markers import markers
+from ..offload import render
 from ..settings.types import Settings
-from ..view.render import render
-from .ops import load_session
+from .next import paging
+from .ops import load_session, load_tree, load_vc
+from .trie import PathTrie
 from .types import Selection, State, VCStatus
 
 
-def initial(nvim: Nvim, pool: Executor, settings: Settings) -> State:
+def initial(
+    nvim: Nvim,
+    pool: Executor,
+    io: Executor,
+    background: Background,
+    jobs: Executor,
+    reaper: Background,
+    settings: Settings,
+) -> State:
     cwd = get_cwd(nvim)
     session_store = (
         Path(nvim.funcs.stdpath("cache")) / "chad_sessions"
         if settings.xdg
         else SESSION_DIR
     )
+    reaper.submit(reap.__name__, lambda: reap(session_store))
 
     session = (
         load_session(cwd, session_store=session_store) if settings.session else None
     )
-    index = session.index if session and session.index is not None else {cwd}
+    index = PathTrie(
+        session.index if session and session.index is not None else {cwd}
+    )
 
     show_hidden = (
         session.show_hidden
@@ -38,9 +53,22 @@ def initial(nvim: Nvim, pool: Executor, settings: Settings) -> State:
     )
 
     selection: Selection = set()
-    node = new(pool, root=cwd, index=index)
-    marks = markers(nvim)
-    vc = VCStatus()
+    node = (
+        load_tree(cwd, index=index, session_store=session_store)
+        if settings.session
+        else None
+    ) or shallow(
+        cwd, index=index, paging=paging(settings, pages={}, show_hidden=show_hidden)
+    )
+    marks = markers(nvim, prev=None)
+
+    # shown as is, the first `vc_refresh` checks it is still current
+    cached = (
+        load_vc(cwd, session_store=session_store)
+        if settings.session and enable_vc
+        else None
+    )
+    vc = cached[1] if cached else VCStatus()
 
     current = None
     filter_pattern = None
@@ -59,6 +87,10 @@ def initial(nvim: Nvim, pool: Executor, settings: Settings) -> State:
 
     state = State(
         pool=pool,
+        io=io,
+        background=background,
+        jobs=jobs,
+        reaper=reaper,
         session_store=session_store,
         index=index,
         selection=selection,
@@ -69,6 +101,8 @@ def initial(nvim: Nvim, pool: Executor, settings: Settings) -> State:
         width=settings.width,
         root=node,
         markers=marks,
+        pages={},
+        revealed=set(),
         vc=vc,
         current=current,
         derived=derived,
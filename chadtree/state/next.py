@@ -3,13 +3,25 @@ from typing import AbstractSet, Mapping, Optional, Union, cast
 
 from std2.types import Void, VoidType, or_else
 
-from ..fs.cartographer import update
-from ..fs.types import Node
+from ..fs.cartographer import sort_key
+from ..fs.types import Node, Paging
+from ..offload import render, update
 from ..settings.types import Settings
-from ..view.render import render
+from .trie import PathTrie
 from .types import FilterPattern, Index, Markers, Selection, State, VCStatus
 
 
+def paging(
+    settings: Settings, pages: Mapping[PurePath, int], show_hidden: bool
+) -> Paging:
+    return Paging(
+        size=settings.folder_page_size,
+        pages=pages,
+        key=sort_key(settings.view.sort_by),
+        ignores=None if show_hidden else settings.ignores,
+    )
+
+
 def forward(
     state: State,
     *,
@@ -26,24 +38,39 @@ def forward(
     vc: Union[VCStatus, VoidType] = Void,
     current: Union[PurePath, VoidType] = Void,
     paths: Union[AbstractSet[PurePath], VoidType] = Void,
+    pages: Union[Mapping[PurePath, int], VoidType] = Void,
+    revealed: Union[Index, VoidType] = Void,
     window_order: Union[Mapping[int, None], VoidType] = Void,
 ) -> State:
-    new_index = or_else(index, state.index)
-    new_selection = or_else(selection, state.selection)
     new_filter_pattern = or_else(filter_pattern, state.filter_pattern)
+    new_revealed = or_else(revealed, state.revealed)
+    new_index = PathTrie.of(or_else(index, state.index))
+    if new_filter_pattern is None and new_revealed:
+        # folders opened by the filter close with it
+        new_index = PathTrie.of(new_index - new_revealed)
+        new_revealed = set()
+    new_selection = or_else(selection, state.selection)
     new_current = or_else(current, state.current)
+    new_pages = or_else(pages, state.pages)
+    new_hidden = or_else(show_hidden, state.show_hidden)
     new_root = cast(
         Node,
         root
         or (
-            update(state.pool, root=state.root, index=new_index, paths=paths)
+            update(
+                state.pool,
+                settings=settings,
+                root=state.root,
+                index=new_index,
+                paging=paging(settings, pages=new_pages, show_hidden=new_hidden),
+                paths=paths,
+            )
             if not isinstance(paths, VoidType)
             else state.root
         ),
     )
     new_markers = or_else(markers, state.markers)
     new_vc = or_else(vc, state.vc)
-    new_hidden = or_else(show_hidden, state.show_hidden)
     derived = render(
         new_root,
         settings=settings,
@@ -58,6 +85,10 @@ def forward(
 
     new_state = State(
         pool=state.pool,
+        io=state.io,
+        background=state.background,
+        jobs=state.jobs,
+        reaper=state.reaper,
         session_store=state.session_store,
         index=new_index,
         selection=new_selection,
@@ -68,6 +99,8 @@ def forward(
         width=or_else(width, state.width),
         root=new_root,
         markers=new_markers,
+        pages=new_pages,
+        revealed=new_revealed,
         vc=new_vc,
         current=new_current,
         derived=derived,
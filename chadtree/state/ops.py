@@ -1,12 +1,55 @@
+from dataclasses import dataclass
 from hashlib import sha1
 from json import dumps, loads
+from os import fsync, replace
 from pathlib import Path, PurePath
-from typing import Any, Optional
+from tempfile import NamedTemporaryFile
+from typing import Any, Iterator, Mapping, MutableMapping, Optional, Sequence, Tuple
 
+from std2.pathlib import is_relative_to
 from std2.pickle.decoder import new_decoder
 from std2.pickle.encoder import new_encoder
 
-from .types import Session, State
+from ..fs.cartographer import listed
+from ..fs.ops import ancestors, child, intern
+from ..fs.types import Mode, Node
+from ..version_ctl.types import VCStatus
+from .types import Index, Session, State
+
+
+@dataclass(frozen=True)
+class _CompactSession:
+    """
+    index -> {parent: [names]}, parent is relative to the session root when possible
+    """
+
+    index: Optional[Mapping[str, Sequence[str]]]
+    show_hidden: Optional[bool]
+    enable_vc: Optional[bool]
+
+
+@dataclass(frozen=True)
+class _Entry:
+    mode: Sequence[int]
+    mtime: int
+    truncated: int
+
+
+@dataclass(frozen=True)
+class _TreeSnapshot:
+    """
+    listings -> {folder relative to root: {name: entry}}, for every listed folder
+    """
+
+    root: _Entry
+    listings: Mapping[str, Mapping[str, _Entry]]
+
+
+@dataclass(frozen=True)
+class _VCSession:
+    root: PurePath
+    fingerprint: str
+    vc: VCStatus
 
 
 def _session_path(cwd: PurePath, session_store: Path) -> Path:
@@ -15,34 +58,213 @@ def _session_path(cwd: PurePath, session_store: Path) -> Path:
     return part.with_suffix(".json")
 
 
+def _tree_path(cwd: PurePath, session_store: Path) -> Path:
+    hashed = sha1(str(cwd).encode()).hexdigest()
+    return session_store / f"{hashed}.tree.json"
+
+
+def _vc_path(cwd: PurePath, session_store: Path) -> Path:
+    hashed = sha1(str(cwd).encode()).hexdigest()
+    return session_store / f"{hashed}.vc.json"
+
+
+_WRITTEN: MutableMapping[Path, str] = {}
+
+
+def _digest(json: str) -> str:
+    return sha1(json.encode("UTF-8", "surrogateescape")).hexdigest()
+
+
 def _load_json(path: Path) -> Optional[Any]:
     if path.exists():
         json = path.read_text("UTF-8")
+        _WRITTEN[path] = _digest(json)
         return loads(json)
     else:
         return None
 
 
-_DECODER = new_decoder[Session](Session)
-_ENCODER = new_encoder[Session](Session)
+def _dump_json(path: Path, thing: Any) -> None:
+    """
+    Atomic write, skipped if the content is unchanged since last read / write
+
+    Synced before the rename, so a crash leaves the old file or the new one,
+    never an empty one, the temp file never outlives a failed write
+    """
+
+    json = dumps(
+        thing,
+        ensure_ascii=False,
+        check_circular=False,
+        separators=(",", ":"),
+    )
+    digest = _digest(json)
+
+    if _WRITTEN.get(path) != digest:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = NamedTemporaryFile(
+            "w", encoding="UTF-8", dir=path.parent, prefix=path.name, delete=False
+        )
+        replaced = False
+        try:
+            with fd:
+                fd.write(json)
+                fd.flush()
+                fsync(fd.fileno())
+            replace(fd.name, path)
+            replaced = True
+        finally:
+            if not replaced:
+                Path(fd.name).unlink(missing_ok=True)
+
+        _WRITTEN[path] = digest
+
+
+def _compress(cwd: PurePath, index: Index) -> Mapping[str, Sequence[str]]:
+    grouped: MutableMapping[str, MutableMapping[str, None]] = {}
+    for path in sorted(index):
+        parent = path.parent
+        key = parent.relative_to(cwd) if is_relative_to(parent, cwd) else parent
+        grouped.setdefault(str(key), {})[path.name] = None
+
+    return {parent: tuple(names) for parent, names in grouped.items()}
+
+
+def _decompress(cwd: PurePath, index: Mapping[str, Sequence[str]]) -> Index:
+    def cont() -> Iterator[PurePath]:
+        for parent, names in index.items():
+            base = intern(cwd / parent)
+            for name in names:
+                yield child(base, name)
+
+    return {*cont()}
+
+
+_DECODER = new_decoder[_CompactSession](_CompactSession)
+_ENCODER = new_encoder[_CompactSession](_CompactSession)
+_LEGACY_DECODER = new_decoder[Session](Session)
+_TREE_DECODER = new_decoder[_TreeSnapshot](_TreeSnapshot)
+_TREE_ENCODER = new_encoder[_TreeSnapshot](_TreeSnapshot)
+_VC_DECODER = new_decoder[_VCSession](_VCSession)
+_VC_ENCODER = new_encoder[_VCSession](_VCSession)
 
 
 def load_session(cwd: PurePath, session_store: Path) -> Session:
     load_path = _session_path(cwd, session_store=session_store)
     try:
-        session: Session = _DECODER(_load_json(load_path))
-        return session
+        json = _load_json(load_path)
     except Exception:
         return Session(index=None, show_hidden=None, enable_vc=None)
+    else:
+        try:
+            compact: _CompactSession = _DECODER(json)
+        except Exception:
+            try:
+                session: Session = _LEGACY_DECODER(json)
+                return session
+            except Exception:
+                return Session(index=None, show_hidden=None, enable_vc=None)
+        else:
+            index = (
+                _decompress(cwd, index=compact.index)
+                if compact.index is not None
+                else None
+            )
+            return Session(
+                index=index,
+                show_hidden=compact.show_hidden,
+                enable_vc=compact.enable_vc,
+            )
 
 
 def dump_session(state: State, session_store: Path) -> None:
-    session = Session(
-        index=state.index, show_hidden=state.show_hidden, enable_vc=state.enable_vc
+    cwd = state.root.path
+    session = _CompactSession(
+        index=_compress(cwd, index=state.index - state.revealed),
+        show_hidden=state.show_hidden,
+        enable_vc=state.enable_vc,
     )
-    json = _ENCODER(session)
+    path = _session_path(cwd, session_store=session_store)
+    _dump_json(path, thing=_ENCODER(session))
+
+
+def _entry(node: Node) -> _Entry:
+    return _Entry(mode=sorted(node.mode), mtime=node.mtime, truncated=node.truncated)
+
+
+def load_tree(cwd: PurePath, index: Index, session_store: Path) -> Optional[Node]:
+    """
+    Last dumped tree, only if it has a listing for every expanded folder in it
+    """
+
+    load_path = _tree_path(cwd, session_store=session_store)
+    try:
+        snapshot: _TreeSnapshot = _TREE_DECODER(_load_json(load_path))
+    except Exception:
+        return None
+    else:
+        listings = {
+            intern(cwd / rel): children for rel, children in snapshot.listings.items()
+        }
+
+        def cont(path: PurePath, entry: _Entry) -> Node:
+            mode = {*map(Mode, entry.mode)}
+            if Mode.folder in mode and path in index and path not in listings:
+                raise KeyError(path)
+            else:
+                children = {
+                    child(path, name): cont(child(path, name), entry=sub)
+                    for name, sub in listings.get(path, {}).items()
+                }
+                return Node(
+                    path=path,
+                    mode=mode,
+                    ancestors=ancestors(path),
+                    mtime=entry.mtime,
+                    truncated=entry.truncated,
+                    children=children,
+                )
+
+        try:
+            return cont(intern(cwd), entry=snapshot.root)
+        except (KeyError, ValueError):
+            return None
+
+
+def dump_tree(state: State, session_store: Path) -> None:
+    root = state.root
+    listings = {
+        str(node.path.relative_to(root.path)): {
+            child.path.name: _entry(child) for child in node.children.values()
+        }
+        for node in listed(root, index=state.index)
+    }
+    snapshot = _TreeSnapshot(root=_entry(root), listings=listings)
+    path = _tree_path(root.path, session_store=session_store)
+    _dump_json(path, thing=_TREE_ENCODER(snapshot))
+
+
+def load_vc(cwd: PurePath, session_store: Path) -> Optional[Tuple[str, VCStatus]]:
+    """
+    -> (fingerprint, status), the fingerprint is left for the caller to check,
+    finding it means running git
+    """
+
+    load_path = _vc_path(cwd, session_store=session_store)
+    try:
+        session: _VCSession = _VC_DECODER(_load_json(load_path))
+    except Exception:
+        return None
+    else:
+        if session.root == cwd:
+            return session.fingerprint, session.vc
+        else:
+            return None
+
 
-    path = _session_path(state.root.path, session_store=session_store)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    json = dumps(json, ensure_ascii=False, check_circular=False, indent=2)
-    path.write_text(json, "UTF-8")
+def dump_vc(
+    cwd: PurePath, fingerprint: str, vc: VCStatus, session_store: Path
+) -> None:
+    session = _VCSession(root=cwd, fingerprint=fingerprint, vc=vc)
+    path = _vc_path(cwd, session_store=session_store)
+    _dump_json(path, thing=_VC_ENCODER(session))
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import PurePath
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Sequence,
+    TypeVar,
+    cast,
+)
+
+from ..fs.ops import child, intern
+
+
+@dataclass(frozen=True)
+class _Node:
+    present: bool = False
+    size: int = 0
+    children: Mapping[str, _Node] = field(default_factory=dict)
+
+
+_EMPTY = _Node()
+
+_S = TypeVar("_S")
+
+
+def _build(paths: Iterable[PurePath]) -> _Node:
+    tree: MutableMapping[str, Any] = {}
+    marker = ""
+    for path in paths:
+        node = tree
+        for part in path.parts:
+            node = node.setdefault(part, {})
+        node[marker] = None
+
+    def freeze(node: MutableMapping[str, Any]) -> _Node:
+        present = marker in node
+        children = {k: freeze(v) for k, v in node.items() if k != marker}
+        size = present + sum(c.size for c in children.values())
+        return _Node(present=present, size=size, children=children)
+
+    return freeze(tree)
+
+
+def _make(present: bool, children: Mapping[str, _Node]) -> _Node:
+    size = present + sum(c.size for c in children.values())
+    return _Node(present=present, size=size, children=children) if size else _EMPTY
+
+
+def _set(node: _Node, parts: Sequence[str], present: bool) -> _Node:
+    """
+    Copy on write, only the nodes along `parts` are rebuilt
+    """
+
+    if not parts:
+        return _make(present, children=node.children)
+    else:
+        head, *tail = parts
+        sub = _set(node.children.get(head, _EMPTY), parts=tail, present=present)
+        children = {**node.children, head: sub}
+        if not sub.size:
+            children.pop(head)
+        return _make(node.present, children=children)
+
+
+def _drop(node: _Node, parts: Sequence[str]) -> _Node:
+    if not parts:
+        return _EMPTY
+    else:
+        head, *tail = parts
+        if head not in node.children:
+            return node
+        else:
+            sub = _drop(node.children[head], parts=tail)
+            children = {**node.children, head: sub}
+            if not sub.size:
+                children.pop(head)
+            return _make(node.present, children=children)
+
+
+def _find(node: _Node, parts: Sequence[str]) -> _Node:
+    for part in parts:
+        if not (node := node.children.get(part, _EMPTY)).size:
+            break
+    return node
+
+
+def _walk(node: _Node, path: PurePath) -> Iterator[PurePath]:
+    if node.present:
+        yield path
+    for name, sub in node.children.items():
+        yield from _walk(sub, path=child(path, name))
+
+
+def _top(node: _Node) -> Iterator[PurePath]:
+    for name, sub in node.children.items():
+        yield from _walk(sub, path=intern(PurePath(name)))
+
+
+class PathTrie(AbstractSet[PurePath]):
+    """
+    Expanded folders, as a persistent prefix tree over path parts
+
+    Adding / removing a path rebuilds only its own branch, subtree queries only
+    visit the subtree
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self, paths: Iterable[PurePath] = ()) -> None:
+        self._root = _build(paths)
+
+    @classmethod
+    def _of_root(cls, root: _Node) -> PathTrie:
+        trie = cls()
+        trie._root = root
+        return trie
+
+    @classmethod
+    def of(cls, paths: AbstractSet[PurePath]) -> PathTrie:
+        return paths if isinstance(paths, PathTrie) else cls(paths)
+
+    @classmethod
+    def _from_iterable(cls, it: Iterable[_S]) -> AbstractSet[_S]:
+        return cast(AbstractSet[_S], cls(cast(Iterable[PurePath], it)))
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, PurePath):
+            return False
+        else:
+            node = self._root
+            for part in item.parts:
+                if not (node := node.children.get(part, _EMPTY)).size:
+                    return False
+            return node.present
+
+    def __iter__(self) -> Iterator[PurePath]:
+        return _top(self._root)
+
+    def __len__(self) -> int:
+        return self._root.size
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({[*self]!r})"
+
+    def __reduce__(self) -> Any:
+        return type(self)._of_root, (self._root,)
+
+    def __or__(self, other: Iterable[Any]) -> PathTrie:
+        root = self._root
+        for path in other:
+            root = _set(root, parts=path.parts, present=True)
+        return self._of_root(root)
+
+    __ror__ = __or__
+
+    def __sub__(self, other: Iterable[Any]) -> PathTrie:
+        root = self._root
+        for path in other:
+            root = _set(root, parts=path.parts, present=False)
+        return self._of_root(root)
+
+    def __xor__(self, other: Iterable[Any]) -> PathTrie:
+        root = self._root
+        for path in {*other}:
+            root = _set(root, parts=path.parts, present=path not in self)
+        return self._of_root(root)
+
+    __rxor__ = __xor__
+
+    def subtree(self, path: PurePath) -> Iterator[PurePath]:
+        """
+        `path` itself if present, and everything under it
+        """
+
+        node = _find(self._root, parts=path.parts)
+        return _walk(node, path=intern(path)) if node.size else iter(())
+
+    def without_subtree(self, path: PurePath) -> PathTrie:
+        return self._of_root(_drop(self._root, parts=path.parts))
+
+    def prune(self, keep: Callable[[PurePath], bool]) -> PathTrie:
+        """
+        Drop paths failing `keep`, and everything under them unchecked
+        """
+
+        def cont(node: _Node, path: PurePath) -> _Node:
+            if node.present and not keep(path):
+                return _EMPTY
+            else:
+                children = {
+                    name: cont(sub, path=child(path, name))
+                    for name, sub in node.children.items()
+                }
+                return _make(
+                    node.present,
+                    children={k: v for k, v in children.items() if v.size},
+                )
+
+        top = {
+            name: cont(sub, path=intern(PurePath(name)))
+            for name, sub in self._root.children.items()
+        }
+        return self._of_root(
+            _make(False, children={k: v for k, v in top.items() if v.size})
+        )
@@ -3,6 +3,8 @@ from dataclasses import dataclass
 from pathlib import Path, PurePath
 from typing import AbstractSet, Mapping, Optional
 
+from ..executors import Background
+from ..fs.search import Matcher
 from ..fs.types import Node
 from ..nvim.types import Markers
 from ..version_ctl.types import VCStatus
@@ -15,11 +17,16 @@ Selection = Index
 @dataclass(frozen=True)
 class FilterPattern:
     pattern: str
+    matcher: Matcher
 
 
 @dataclass(frozen=True)
 class State:
     pool: Executor
+    io: Executor
+    background: Background
+    jobs: Executor
+    reaper: Background
     session_store: Path
     current: Optional[PurePath]
     derived: Derived
@@ -28,6 +35,8 @@ class State:
     follow: bool
     index: Index
     markers: Markers
+    pages: Mapping[PurePath, int]
+    revealed: Index
     root: Node
     selection: Selection
     show_hidden: bool
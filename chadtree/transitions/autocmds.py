@@ -10,7 +10,7 @@ from ..nvim.markers import markers
 from ..registry import NAMESPACE, autocmd, rpc
 from ..settings.types import Settings
 from ..state.next import forward
-from ..state.ops import dump_session
+from ..state.ops import dump_session, dump_tree
 from ..state.types import State
 from .shared.current import new_current_file, new_root
 from .shared.wm import find_current_buffer_path
@@ -26,7 +26,19 @@ def save_session(nvim: Nvim, state: State, settings: Settings) -> None:
     dump_session(state, session_store=state.session_store)
 
 
-autocmd("FocusLost", "ExitPre") << f"lua {NAMESPACE}.{save_session.name}()"
+@rpc(blocking=False)
+def _save_snapshot(nvim: Nvim, state: State, settings: Settings) -> None:
+    """
+    Save CHADTree state, and the tree painted at next startup
+
+    Only read at startup, too big to encode on every polling tick
+    """
+
+    dump_session(state, session_store=state.session_store)
+    dump_tree(state, session_store=state.session_store)
+
+
+autocmd("FocusLost", "ExitPre") << f"lua {NAMESPACE}.{_save_snapshot.name}()"
 
 
 @rpc(blocking=False)
@@ -75,7 +87,7 @@ def _update_follow(nvim: Nvim, state: State, settings: Settings) -> Optional[Sta
 
     try:
 
-        if (curr := find_current_buffer_path(nvim)) and is_file(state.pool, path=curr):
+        if (curr := find_current_buffer_path(nvim)) and is_file(state.io, path=curr):
             stage = new_current_file(nvim, state=state, settings=settings, current=curr)
             return stage
         else:
@@ -88,14 +100,17 @@ autocmd("BufEnter") << f"lua {NAMESPACE}.{_update_follow.name}()"
 
 
 @rpc(blocking=False)
-def _update_markers(nvim: Nvim, state: State, settings: Settings) -> Stage:
+def _update_markers(nvim: Nvim, state: State, settings: Settings) -> Optional[Stage]:
     """
     Update markers
     """
 
-    mks = markers(nvim)
-    new_state = forward(state, settings=settings, markers=mks)
-    return Stage(new_state)
+    mks = markers(nvim, prev=state.markers)
+    if mks is state.markers:
+        return None
+    else:
+        new_state = forward(state, settings=settings, markers=mks)
+        return Stage(new_state)
 
 
 autocmd("QuickfixCmdPost") << f"lua {NAMESPACE}.{_update_markers.name}()"
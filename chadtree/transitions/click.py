@@ -11,7 +11,7 @@ from ..settings.localization import LANG
 from ..settings.types import Settings
 from ..state.next import forward
 from ..state.types import State
-from .shared.index import indices
+from .shared.index import indices, synthetic
 from .shared.open_file import open_file
 from .shared.wm import find_fm_windows
 from .types import ClickType, Stage, State
@@ -20,6 +20,16 @@ from .types import ClickType, Stage, State
 def _click(
     nvim: Nvim, state: State, settings: Settings, is_visual: bool, click_type: ClickType
 ) -> Optional[Stage]:
+    if folder := synthetic(nvim, state=state):
+        if folder.truncated:
+            pages = {**state.pages, folder.path: state.pages.get(folder.path, 1) + 1}
+            new_state = forward(
+                state, settings=settings, pages=pages, paths={folder.path}
+            )
+            return Stage(new_state)
+        else:
+            return None
+
     node = next(indices(nvim, state=state, is_visual=is_visual), None)
 
     if not node:
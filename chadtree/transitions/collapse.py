@@ -3,10 +3,10 @@ from typing import Optional
 from pynvim import Nvim
 
 from ..fs.cartographer import is_dir
-from ..fs.ops import ancestors
 from ..registry import rpc
 from ..settings.types import Settings
 from ..state.next import forward
+from ..state.trie import PathTrie
 from ..state.types import State
 from .shared.index import indices
 from .types import Stage
@@ -29,12 +29,8 @@ def _collapse(
         else:
             path = node.path.parent
 
-        paths = {
-            indexed
-            for indexed in state.index
-            if path in (ancestors(indexed) | {indexed})
-        }
-
-        index = (state.index - paths) | {state.root.path}
+        expanded = PathTrie.of(state.index)
+        paths = {*expanded.subtree(path)}
+        index = expanded.without_subtree(path) | {state.root.path}
         new_state = forward(state, settings=settings, index=index, paths=paths)
         return Stage(new_state, focus=path)
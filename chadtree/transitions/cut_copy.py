@@ -9,6 +9,7 @@ from pynvim.api import Nvim
 from pynvim_pp.api import ask, ask_mc, get_cwd
 from pynvim_pp.lib import write
 
+from ..executors import Job
 from ..fs.cartographer import is_dir
 from ..fs.ops import ancestors, copy, cut, exists, unify_ancestors
 from ..fs.types import Node
@@ -19,8 +20,8 @@ from ..settings.types import Settings
 from ..state.next import forward
 from ..state.types import State
 from ..view.ops import display_path
+from .jobs import run_job
 from .shared.index import indices
-from .shared.refresh import refresh
 from .shared.wm import kill_buffers
 from .types import Stage
 
@@ -40,7 +41,7 @@ def _operation(
     nono: AbstractSet[PurePath],
     op_name: str,
     is_move: bool,
-    action: Callable[[Executor, Mapping[PurePath, PurePath]], None],
+    action: Callable[[Executor, Mapping[PurePath, PurePath], Job], None],
 ) -> Optional[Stage]:
     node = next(indices(nvim, state=state, is_visual=is_visual), None)
     selection = state.selection
@@ -104,12 +105,11 @@ def _operation(
             if not ans:
                 return None
             else:
-                try:
-                    action(state.pool, operations)
-                except Exception as e:
-                    write(nvim, e, error=True)
-                    return refresh(nvim, state=state, settings=settings)
-                else:
+
+                def work(job: Job) -> None:
+                    action(state.jobs, operations, job)
+
+                def done(nvim: Nvim, state: State, settings: Settings) -> Stage:
                     paths = {
                         p.parent for p in chain(operations.keys(), operations.values())
                     }
@@ -144,6 +144,9 @@ def _operation(
                         lsp_created(nvim, paths=new_selection)
                     return Stage(new_state, focus=focus)
 
+                run_job(op_name, work=work, done=done)
+                return None
+
 
 @rpc(blocking=False)
 def _cut(
@@ -1,27 +1,29 @@
 from concurrent.futures import Executor
+from functools import partial
 from locale import strxfrm
 from os import linesep
 from pathlib import PurePath
 from shutil import which
-from subprocess import DEVNULL, PIPE, CalledProcessError, check_call
-from typing import Callable, Iterable, Optional
+from subprocess import DEVNULL, PIPE, check_call
+from typing import Callable, Iterable, Optional, Sequence
 
 from pynvim.api import Nvim
 from pynvim_pp.api import ask_mc, get_cwd
-from pynvim_pp.lib import threadsafe_call, write
-from pynvim_pp.logging import log
+from pynvim_pp.lib import write
 
-from ..fs.ops import ancestors, remove, unify_ancestors
+from ..executors import Job
+from ..fs.ops import ancestors, unify_ancestors
+from ..fs.tombstone import bury, reap
+from ..fs.trash import directory_sizes, trash
 from ..lsp.notify import lsp_removed
-from ..registry import enqueue_event, rpc
+from ..registry import rpc
 from ..settings.localization import LANG
 from ..settings.types import Settings
 from ..state.next import forward
 from ..state.types import State
 from ..view.ops import display_path
-from .refresh import refresh as _refresh
+from .jobs import run_job
 from .shared.index import indices
-from .shared.refresh import refresh
 from .shared.wm import kill_buffers
 from .types import Stage
 
@@ -31,7 +33,7 @@ def _remove(
     state: State,
     settings: Settings,
     is_visual: bool,
-    yeet: Callable[[Executor, Iterable[PurePath]], None],
+    yeet: Callable[[Executor, Iterable[PurePath], Job], None],
 ) -> Optional[Stage]:
     cwd, root = get_cwd(nvim), state.root.path
     nono = {cwd, root} | ancestors(cwd) | ancestors(root)
@@ -62,12 +64,11 @@ def _remove(
         if not ans:
             return None
         else:
-            try:
-                yeet(state.pool, unified)
-            except Exception as e:
-                write(nvim, e, error=True)
-                return refresh(nvim, state=state, settings=settings)
-            else:
+
+            def work(job: Job) -> None:
+                yeet(state.jobs, unified, job)
+
+            def done(nvim: Nvim, state: State, settings: Settings) -> Stage:
                 paths = {path.parent for path in unified}
                 new_state = forward(
                     state, settings=settings, selection=set(), paths=paths
@@ -79,6 +80,21 @@ def _remove(
                 lsp_removed(nvim, paths=unified)
                 return Stage(new_state)
 
+            run_job(LANG("remove"), work=work, done=done)
+            return None
+
+
+def _bury(state: State) -> Callable[[Executor, Iterable[PurePath], Job], None]:
+    store = state.session_store
+
+    def cont(pool: Executor, paths: Iterable[PurePath], job: Job) -> None:
+        try:
+            bury(pool, store=store, paths=paths, job=job)
+        finally:
+            state.reaper.submit(reap.__name__, lambda: reap(store))
+
+    return cont
+
 
 @rpc(blocking=False)
 def _delete(
@@ -89,33 +105,45 @@ def _delete(
     """
 
     return _remove(
-        nvim, state=state, settings=settings, is_visual=is_visual, yeet=remove
+        nvim,
+        state=state,
+        settings=settings,
+        is_visual=is_visual,
+        yeet=_bury(state),
     )
 
 
-def _sys_trash(nvim: Nvim) -> Callable[[Executor, Iterable[PurePath]], None]:
+def _sys_trash(cwd: PurePath, paths: Sequence[PurePath]) -> None:
+    cmd = "trash"
+    if which(cmd):
+        command = (cmd, "--", *map(str, paths))
+        check_call(command, stdin=DEVNULL, stdout=PIPE, stderr=PIPE, cwd=cwd)
+    else:
+        raise LookupError(LANG("sys_trash_err"))
+
+
+def _trash_to(
+    nvim: Nvim, state: State
+) -> Callable[[Executor, Iterable[PurePath], Job], None]:
+    """
+    Native trash first, the `trash` CLI for whatever it could not take
+    """
+
     cwd = get_cwd(nvim)
 
-    def cont(pool: Executor, paths: Iterable[PurePath]) -> None:
-        def c1() -> None:
-            cmd = "trash"
-            if which(cmd):
-                command = (cmd, "--", *map(str, paths))
-                check_call(command, stdin=DEVNULL, stdout=PIPE, stderr=PIPE, cwd=cwd)
-            else:
-                raise LookupError(LANG("sys_trash_err"))
-
-        def c2() -> None:
-            try:
-                c1()
-            except (CalledProcessError, LookupError) as e:
-                threadsafe_call(nvim, write, nvim, e, error=True)
-            except Exception as e:
-                log.exception("%s", e)
-            else:
-                enqueue_event(_refresh, True)
-
-        pool.submit(c2)
+    def cont(pool: Executor, paths: Iterable[PurePath], job: Job) -> None:
+        trashed = trash(pool, paths=tuple(paths), job=job)
+        for root in trashed.folders:
+            state.background.submit(
+                f"{directory_sizes.__name__}:{root}",
+                partial(directory_sizes, root),
+            )
+
+        if trashed.leftover:
+            job.check()
+            _sys_trash(cwd, paths=trashed.leftover)
+            for _ in trashed.leftover:
+                job.advance()
 
     return cont
 
@@ -133,5 +161,5 @@ def _trash(
         state=state,
         settings=settings,
         is_visual=is_visual,
-        yeet=_sys_trash(nvim),
+        yeet=_trash_to(nvim, state=state),
     )
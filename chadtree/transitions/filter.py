@@ -1,17 +1,106 @@
+from pathlib import PurePath
+from re import error
 from typing import Optional
 
 from pynvim import Nvim
 from pynvim_pp.api import ask
+from pynvim_pp.lib import write
+from pynvim_pp.logging import log
+from std2.pathlib import is_relative_to
 
-from ..registry import rpc
+from ..consts import FILTER_EXPAND_LIMIT
+from ..fs.ops import ancestors
+from ..fs.search import compile_matcher, index_project, project, search
+from ..registry import enqueue_event, rpc
 from ..settings.localization import LANG
 from ..settings.types import Settings
 from ..state.next import forward
 from ..state.types import FilterPattern, Selection, State
+from ..version_ctl.git import repo_fingerprint
 from .shared.index import indices
 from .types import Stage
 
 
+def _expand(
+    state: State,
+    settings: Settings,
+    filter_pattern: FilterPattern,
+    selection: Selection,
+) -> State:
+    """
+    Open the folders leading to the best matches, anywhere under root
+
+    They are kept apart in `revealed`, so they close again with the filter, and
+    the ones a previous pattern opened make way for the new ones
+    """
+
+    root = state.root.path
+    hits = search(
+        project(root), matcher=filter_pattern.matcher, limit=FILTER_EXPAND_LIMIT
+    )
+    parents = {
+        parent
+        for hit in hits
+        for parent in ancestors(hit)
+        if is_relative_to(parent, root)
+    }
+    expanded = state.index - state.revealed
+    revealed = parents - expanded
+    return forward(
+        state,
+        settings=settings,
+        index=expanded | revealed,
+        revealed=revealed,
+        selection=selection,
+        filter_pattern=filter_pattern,
+        paths=revealed - state.index,
+    )
+
+
+@rpc(blocking=False)
+def _project_indexed(
+    nvim: Nvim,
+    state: State,
+    settings: Settings,
+    root: PurePath,
+    filter_pattern: FilterPattern,
+) -> Optional[Stage]:
+    """
+    Re-apply the filter that asked for the index, if it is still the same one
+    """
+
+    if state.root.path == root and state.filter_pattern == filter_pattern:
+        new_state = _expand(
+            state,
+            settings=settings,
+            filter_pattern=filter_pattern,
+            selection=state.selection,
+        )
+        return Stage(new_state)
+    else:
+        return None
+
+
+def _reindex(state: State, settings: Settings, filter_pattern: FilterPattern) -> None:
+    root = state.root.path
+
+    def cont() -> None:
+        prev = project(root)
+        try:
+            repo = repo_fingerprint(root)
+            fingerprint = repo[1] if repo else None
+            indexed = index_project(
+                root, ignores=settings.ignores, fingerprint=fingerprint
+            )
+        except Exception as e:
+            log.exception("%s", e)
+        else:
+            if indexed is not prev:
+                enqueue_event(_project_indexed, root, filter_pattern)
+
+    state.background.submit(_project_indexed.name, cont)
+
+
 @rpc(blocking=False)
 def _clear_filter(
     nvim: Nvim, state: State, settings: Settings, is_visual: bool
@@ -45,9 +134,24 @@ def _filter(
         old_p = state.filter_pattern.pattern if state.filter_pattern else ""
         pattern = ask(nvim, question=LANG("new_filter"), default=old_p)
 
-        filter_pattern = FilterPattern(pattern=pattern) if pattern else None
-        selection: Selection = state.selection if filter_pattern else set()
-        new_state = forward(
-            state, settings=settings, selection=selection, filter_pattern=filter_pattern
-        )
-        return Stage(new_state, focus=focus)
+        if not pattern:
+            new_state = forward(
+                state, settings=settings, selection=set(), filter_pattern=None
+            )
+            return Stage(new_state, focus=focus)
+        else:
+            try:
+                matcher = compile_matcher(pattern)
+            except error as e:
+                write(nvim, e, error=True)
+                return None
+
+            filter_pattern = FilterPattern(pattern=pattern, matcher=matcher)
+            new_state = _expand(
+                state,
+                settings=settings,
+                filter_pattern=filter_pattern,
+                selection=state.selection,
+            )
+            _reindex(state, settings=settings, filter_pattern=filter_pattern)
+            return Stage(new_state, focus=focus)
@@ -0,0 +1,105 @@
+from threading import Lock, Thread
+from typing import Callable, Iterator, MutableMapping, Optional
+
+from pynvim import Nvim
+from pynvim_pp.lib import write
+from std2.locale import si_prefixed
+
+from ..consts import JOB_REPORT_INTERVAL
+from ..executors import Cancelled, Job
+from ..registry import enqueue_event, rpc
+from ..settings.localization import LANG
+from ..settings.types import Settings
+from ..state.types import State
+from .shared.refresh import refresh
+from .types import Stage
+
+Continuation = Callable[[Nvim, State, Settings], Optional[Stage]]
+
+_lock = Lock()
+_JOBS: MutableMapping[Job, None] = {}
+
+
+@rpc(blocking=False)
+def _job_progress(nvim: Nvim, state: State, settings: Settings) -> None:
+    with _lock:
+        jobs = tuple(_JOBS)
+
+    def cont() -> Iterator[str]:
+        for job in jobs:
+            done, total, size = job.progress()
+            yield LANG(
+                "job_progress",
+                name=job.name,
+                done=done,
+                total=total,
+                size=si_prefixed(size, precision=2),
+            )
+
+    if msg := "  ".join(cont()):
+        write(nvim, msg)
+
+
+@rpc(blocking=False)
+def _job_finished(
+    nvim: Nvim,
+    state: State,
+    settings: Settings,
+    job: Job,
+    done: Continuation,
+    error: Optional[Exception],
+) -> Optional[Stage]:
+    """
+    Success -> the job's own targeted update, otherwise a full refresh
+    """
+
+    if not error:
+        write(nvim, LANG("ok_sym"))
+        return done(nvim, state, settings)
+    else:
+        if isinstance(error, Cancelled):
+            write(nvim, LANG("job_cancelled", name=job.name))
+        else:
+            write(nvim, error, error=True)
+        return refresh(nvim, state=state, settings=settings)
+
+
+@rpc(blocking=False)
+def _cancel_jobs(nvim: Nvim, state: State, settings: Settings, is_visual: bool) -> None:
+    """
+    Cancel running file operations
+    """
+
+    with _lock:
+        jobs = tuple(_JOBS)
+
+    for job in jobs:
+        job.cancel()
+
+
+def run_job(name: str, work: Callable[[Job], None], done: Continuation) -> None:
+    """
+    Off the event loop, on its own thread so it can still fan out over the pools
+    """
+
+    job = Job(
+        name,
+        on_progress=lambda: enqueue_event(_job_progress, background=True),
+        interval=JOB_REPORT_INTERVAL,
+    )
+
+    def cont() -> None:
+        error: Optional[Exception] = None
+        with _lock:
+            _JOBS[job] = None
+        enqueue_event(_job_progress, background=True)
+        try:
+            work(job)
+        except Exception as e:
+            error = e
+        finally:
+            with _lock:
+                _JOBS.pop(job, None)
+        enqueue_event(_job_finished, job, done, error)
+
+    Thread(target=cont, daemon=True).start()
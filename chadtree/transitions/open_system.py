@@ -47,4 +47,4 @@ def _open_sys(nvim: Nvim, state: State, settings: Settings, is_visual: bool) ->
             except Exception as e:
                 log.exception("%s", e)
 
-        state.pool.submit(cont)
+        state.io.submit(cont)
@@ -1,6 +1,7 @@
 from pynvim import Nvim
-from pynvim_pp.api import list_wins, win_close
+from pynvim_pp.api import win_close
 
+from ..nvim.layout import layout
 from ..registry import rpc
 from ..settings.types import Settings
 from ..state.types import State
@@ -13,7 +14,7 @@ def _quit(nvim: Nvim, state: State, settings: Settings, is_visual: bool) -> None
     Close sidebar
     """
 
-    wins = list_wins(nvim)
+    wins = layout(nvim).windows
     if len(wins) <= 1:
         nvim.api.command("quit")
     else:
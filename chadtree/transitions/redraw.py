@@ -1,9 +1,9 @@
 from pathlib import PurePath
-from typing import Optional, Sequence
+from typing import MutableMapping, MutableSequence, Optional, Sequence
 from uuid import uuid4
 
 from pynvim import Nvim
-from pynvim.api import NvimError
+from pynvim.api import NvimError, Window
 from pynvim.api.buffer import Buffer
 from pynvim_pp.api import buf_get_var, buf_line_count, win_get_cursor
 from pynvim_pp.atomic import Atomic
@@ -65,10 +65,13 @@ def redraw(nvim: Nvim, state: State, focus: Optional[PurePath]) -> None:
     ns = nvim.api.create_namespace(FM_NAMESPACE)
     use_extmarks = nvim.funcs.has("nvim-0.6")
 
+    grouped: MutableMapping[Buffer, MutableSequence[Window]] = {}
     for win, buf in find_fm_windows(nvim):
+        grouped.setdefault(buf, []).append(win)
+
+    for buf, wins in grouped.items():
         p_count = buf_line_count(nvim, buf=buf)
         n_count = len(state.derived.lines)
-        row, col = win_get_cursor(nvim, win=win)
         (r1, c1), (r2, c2) = operator_marks(nvim, buf=buf, visual_type=None)
 
         try:
@@ -76,15 +79,6 @@ def redraw(nvim: Nvim, state: State, focus: Optional[PurePath]) -> None:
         except DecodeError:
             hashed_lines = ("",)
 
-        if focus_row is not None:
-            new_row: Optional[int] = focus_row + 1
-        elif row >= n_count:
-            new_row = n_count
-        elif p_count != n_count:
-            new_row = row + 1
-        else:
-            new_row = None
-
         a1 = Atomic()
         a1.buf_set_option(buf, "modifiable", True)
 
@@ -100,8 +94,21 @@ def redraw(nvim: Nvim, state: State, focus: Optional[PurePath]) -> None:
         a3.buf_set_option(buf, "modifiable", False)
         a3.call_function("setpos", ("'<", (buf.number, r1 + 1, c1 + 1, 0)))
         a3.call_function("setpos", ("'>", (buf.number, r2 + 1, c2 + 1, 0)))
-        if new_row is not None:
-            a3.win_set_cursor(win, (new_row, col))
+
+        for win in wins:
+            row, col = win_get_cursor(nvim, win=win)
+
+            if focus_row is not None:
+                new_row: Optional[int] = focus_row + 1
+            elif row >= n_count:
+                new_row = n_count
+            elif p_count != n_count:
+                new_row = row + 1
+            else:
+                new_row = None
+
+            if new_row is not None:
+                a3.win_set_cursor(win, (new_row, col))
 
         try:
             (a1 + a2 + a3).commit(nvim)
@@ -44,7 +44,7 @@ def _rename(
                 return None
             else:
                 try:
-                    rename(state.pool, operations=operations)
+                    rename(state.io, operations=operations)
                 except Exception as e:
                     write(nvim, e, error=True)
                     return refresh(nvim, state=state, settings=settings)
@@ -0,0 +1,110 @@
+from os import stat
+from pathlib import PurePath
+from typing import AbstractSet, MutableSet, Optional
+
+from pynvim import Nvim
+from std2.pathlib import is_relative_to
+
+from ..fs.cartographer import has_pending, listed, stream
+from ..fs.types import Node
+from ..offload import update
+from ..registry import enqueue_event, rpc
+from ..settings.types import Settings
+from ..state.next import forward, paging
+from ..state.types import State
+from .types import Stage
+
+
+@rpc(blocking=False)
+def _relist(
+    nvim: Nvim,
+    state: State,
+    settings: Settings,
+    base: Node,
+    root: Node,
+    paths: AbstractSet[PurePath],
+) -> Stage:
+    """
+    `root` is `base` with `paths` walked again, off the event loop, if the tree
+    has moved on since, they are walked again here
+    """
+
+    if state.root is base:
+        new_state = forward(state, settings=settings, root=root)
+    else:
+        new_state = forward(state, settings=settings, paths=paths)
+    return Stage(new_state)
+
+
+@rpc(blocking=False)
+def _partial_tree(
+    nvim: Nvim, state: State, settings: Settings, base: Node, root: Node
+) -> Optional[Stage]:
+    """
+    Ignored once anything else has replaced the tree the stream grew `root` from,
+    a full walk or an expand / collapse
+    """
+
+    if state.root is base and has_pending(state.root):
+        new_state = forward(state, settings=settings, root=root)
+        return Stage(new_state)
+    else:
+        return None
+
+
+@rpc(blocking=False)
+def revalidate(nvim: Nvim, state: State, settings: Settings) -> None:
+    """
+    Finish the startup walk, and re-list folders whose mtime moved since
+    the tree was walked / restored
+    """
+
+    if has_pending(state.root):
+
+        def fill() -> None:
+            base = state.root
+            for root in stream(
+                state.pool,
+                root=state.root,
+                index=state.index,
+                paging=paging(
+                    settings, pages=state.pages, show_hidden=state.show_hidden
+                ),
+            ):
+                enqueue_event(_partial_tree, base, root)
+                base = root
+
+        state.background.submit(_partial_tree.name, fill)
+
+    base = state.root
+    folders = tuple((node.path, node.mtime) for node in listed(base, index=state.index))
+
+    def cont() -> None:
+        stale: MutableSet[PurePath] = set()
+        for path, mtime in folders:
+            if any(is_relative_to(path, p) for p in stale):
+                continue
+            else:
+                try:
+                    changed = stat(path).st_mtime_ns != mtime
+                except OSError:
+                    changed = True
+                    path = path.parent if path != base.path else path
+
+                if changed:
+                    stale.add(path)
+
+        if stale:
+            root = update(
+                state.pool,
+                settings=settings,
+                root=base,
+                index=state.index,
+                paging=paging(
+                    settings, pages=state.pages, show_hidden=state.show_hidden
+                ),
+                paths=stale,
+            )
+            enqueue_event(_relist, base, root, stale, background=True)
+
+    state.background.submit(revalidate.name, cont)
@@ -2,18 +2,47 @@ from typing import Optional
 
 from pynvim import Nvim
 from pynvim.api.common import NvimError
+from pynvim_pp.logging import log
 
-from ..registry import rpc
+from ..fs.types import Node
+from ..registry import enqueue_event, rpc
 from ..settings.types import Settings
 from ..state.types import State
-from .shared.refresh import refresh
+from .shared.refresh import Plan, apply, plan, walk
 from .types import Stage
 
 
 @rpc(blocking=False)
-def schedule_update(nvim: Nvim, state: State, settings: Settings) -> Optional[Stage]:
+def _walked(
+    nvim: Nvim, state: State, settings: Settings, plan: Plan, root: Node
+) -> Optional[Stage]:
+    """
+    Dropped if the tree moved on while walking, the next tick will walk again
+    """
+
+    if state.root is not plan.base:
+        return None
+    else:
+        try:
+            return apply(nvim, state=state, settings=settings, plan=plan, new_root=root)
+        except NvimError:
+            return None
+
+
+@rpc(blocking=False)
+def schedule_update(nvim: Nvim, state: State, settings: Settings) -> None:
     try:
-        stage = refresh(nvim, state=state, settings=settings)
-        return stage
+        p = plan(nvim, state=state)
     except NvimError:
-        return None
+        pass
+    else:
+
+        def cont() -> None:
+            try:
+                root = walk(state, settings=settings, plan=p)
+            except Exception as e:
+                log.exception("%s", e)
+            else:
+                enqueue_event(_walked, p, root)
+
+        state.background.submit(schedule_update.name, cont)
@@ -4,10 +4,10 @@ from typing import AbstractSet, Optional
 from pynvim import Nvim
 from std2.pathlib import is_relative_to, longest_common_path
 
-from ...fs.cartographer import new
 from ...fs.ops import ancestors
+from ...offload import new
 from ...settings.types import Settings
-from ...state.next import forward
+from ...state.next import forward, paging
 from ...state.types import State
 from ..types import Stage
 
@@ -39,7 +39,13 @@ def new_root(
     indices: AbstractSet[PurePath],
 ) -> State:
     index = state.index | ancestors(new_cwd) | {new_cwd} | indices
-    root = new(state.pool, root=new_cwd, index=index)
+    root = new(
+        state.pool,
+        settings=settings,
+        root=new_cwd,
+        index=index,
+        paging=paging(settings, pages=state.pages, show_hidden=state.show_hidden),
+    )
     selection = {path for path in state.selection if root.path in ancestors(path)}
     return forward(
         state, settings=settings, root=root, selection=selection, index=index
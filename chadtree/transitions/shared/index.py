@@ -1,4 +1,5 @@
-from typing import Iterator, Optional
+from pathlib import PurePath
+from typing import Iterator, MutableSet, Optional
 
 from pynvim.api import Nvim
 from pynvim_pp.api import cur_win, win_get_buf, win_get_cursor
@@ -9,13 +10,48 @@ from ...state.types import State
 from .wm import is_fm_buffer
 
 
-def _row_index(state: State, row: int) -> Optional[Node]:
+def _row_node(state: State, row: int) -> Optional[Node]:
     if (row >= 0) and (row < len(state.derived.node_row_lookup)):
         return state.derived.node_row_lookup[row]
     else:
         return None
 
 
+def _is_synthetic(state: State, node: Node, row: int) -> bool:
+    """
+    "loading" / "more" rows map to their folder, which has a row of its own
+    """
+
+    return state.derived.path_row_lookup.get(node.path) != row
+
+
+def _row_index(state: State, row: int) -> Optional[Node]:
+    node = _row_node(state, row)
+    if node and not _is_synthetic(state, node=node, row=row):
+        return node
+    else:
+        return None
+
+
+def synthetic(nvim: Nvim, state: State) -> Optional[Node]:
+    """
+    Folder owning the "loading" / "more" row under the cursor
+    """
+
+    win = cur_win(nvim)
+    buf = win_get_buf(nvim, win=win)
+
+    if not is_fm_buffer(nvim, buf=buf):
+        return None
+    else:
+        row, _ = win_get_cursor(nvim, win=win)
+        node = _row_node(state, row)
+        if node and _is_synthetic(state, node=node, row=row):
+            return node
+        else:
+            return None
+
+
 def indices(nvim: Nvim, state: State, is_visual: bool) -> Iterator[Node]:
     win = cur_win(nvim)
     buf = win_get_buf(nvim, win=win)
@@ -25,7 +61,9 @@ def indices(nvim: Nvim, state: State, is_visual: bool) -> Iterator[Node]:
     else:
         row, _ = win_get_cursor(nvim, win=win)
         node = _row_index(state, row)
+        seen: MutableSet[PurePath] = set()
         if node:
+            seen.add(node.path)
             yield node
 
         if is_visual:
@@ -34,5 +72,6 @@ def indices(nvim: Nvim, state: State, is_visual: bool) -> Iterator[Node]:
             for r in range(row1, row2 + 1):
                 if r != row:
                     node = _row_index(state, r)
-                    if node:
+                    if node and node.path not in seen:
+                        seen.add(node.path)
                         yield node
@@ -17,6 +17,7 @@ from pynvim_pp.api import (
 )
 from pynvim_pp.hold import hold_win_pos
 
+from ...nvim.layout import invalidate_layout
 from ...settings.localization import LANG
 from ...settings.types import Settings
 from ...state.next import forward
@@ -36,6 +37,7 @@ def _show_file(
 ) -> None:
     if click_type is ClickType.tertiary:
         nvim.api.command("tabnew")
+        invalidate_layout()
         win = cur_win(nvim)
         for key, val in settings.win_actual_opts.items():
             win_set_option(nvim, win=win, key=key, val=val)
@@ -79,6 +81,7 @@ def _show_file(
                 temp_buf = cur_buf(nvim)
                 buf_set_option(nvim, buf=temp_buf, key="bufhidden", val="wipe")
 
+            invalidate_layout()
             win = cur_win(nvim)
 
             if buf is None:
@@ -87,6 +90,7 @@ def _show_file(
             else:
                 win_set_buf(nvim, win=win, buf=buf)
 
+            invalidate_layout()
             resize_fm_windows(nvim, last_used=state.window_order, width=state.width)
             nvim.api.command("filetype detect")
 
@@ -1,46 +1,115 @@
+from concurrent.futures import Future
+from dataclasses import dataclass
 from pathlib import PurePath
-from typing import AbstractSet
+from typing import AbstractSet, Optional
 
 from pynvim import Nvim
-from pynvim_pp.api import list_wins
 from std2.types import Void
 
-from ...fs.ops import ancestors, exists
+from ...fs.cartographer import surviving
+from ...fs.ops import ancestors
+from ...fs.types import Node
+from ...nvim.layout import layout
 from ...nvim.markers import markers
+from ...nvim.types import Markers
+from ...offload import update
 from ...settings.types import Settings
-from ...state.next import forward
-from ...state.types import State
+from ...state.next import forward, paging
+from ...state.types import Index, State
 from ..shared.wm import find_current_buffer_path
 from ..types import Stage
 
 
-def refresh(nvim: Nvim, state: State, settings: Settings) -> Stage:
+@dataclass(frozen=True)
+class Plan:
+    base: Node
+    paths: AbstractSet[PurePath]
+    walk_index: Index
+    parent_paths: AbstractSet[PurePath]
+    current: Optional[PurePath]
+
+
+def plan(nvim: Nvim, state: State) -> Plan:
     current = find_current_buffer_path(nvim)
     cwd = state.root.path
     paths = {cwd}
     current_ancestors = ancestors(current) if current else set()
     new_current = current if cwd in current_ancestors else None
 
-    index = {path for path in state.index if exists(path, follow=True)} | paths
-    selection = {s for s in state.selection if exists(s, follow=False)}
     parent_paths: AbstractSet[PurePath] = current_ancestors if state.follow else set()
-    new_index = index if new_current else index | parent_paths
+    walk_index = state.index | paths | (set() if new_current else parent_paths)
+    return Plan(
+        base=state.root,
+        paths=paths,
+        walk_index=walk_index,
+        parent_paths=parent_paths,
+        current=new_current,
+    )
+
+
+def walk(state: State, settings: Settings, plan: Plan) -> Node:
+    """
+    Thread safe, does not touch nvim
+    """
+
+    return update(
+        state.pool,
+        settings=settings,
+        root=plan.base,
+        index=plan.walk_index,
+        paging=paging(settings, pages=state.pages, show_hidden=state.show_hidden),
+        paths=plan.paths,
+    )
+
 
-    window_ids = {w.handle for w in list_wins(nvim)}
+def apply(
+    nvim: Nvim,
+    state: State,
+    settings: Settings,
+    plan: Plan,
+    new_root: Node,
+    mks: Optional[Markers] = None,
+) -> Stage:
+    index = surviving(new_root, index=plan.walk_index, paths=state.index, follow=True)
+    selection = surviving(
+        new_root, index=plan.walk_index, paths=state.selection, follow=False
+    )
+    new_index = (
+        {*index, *plan.paths}
+        if plan.current
+        else {*index, *plan.paths, *plan.parent_paths}
+    )
+
+    window_ids = {info.win.handle for info in layout(nvim).windows}
     window_order = {
         win_id: None for win_id in state.window_order if win_id in window_ids
     }
 
-    mks = markers(nvim)
     new_state = forward(
         state,
         settings=settings,
+        root=new_root,
         index=new_index,
         selection=selection,
-        markers=mks,
-        paths=paths,
-        current=new_current or Void,
+        markers=mks or markers(nvim, prev=state.markers),
+        current=plan.current or Void,
         window_order=window_order,
     )
 
     return Stage(new_state)
+
+
+def refresh(nvim: Nvim, state: State, settings: Settings) -> Stage:
+    """
+    The walk runs off the main thread, while nvim is queried for windows / markers
+
+    On the interactive pool, never behind file operations / git on the I/O one
+    """
+
+    p = plan(nvim, state=state)
+    fut: Future = state.pool.submit(walk, state, settings, p)
+    layout(nvim)
+    mks = markers(nvim, prev=state.markers)
+    return apply(
+        nvim, state=state, settings=settings, plan=p, new_root=fut.result(), mks=mks
+    )
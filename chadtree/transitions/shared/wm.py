@@ -11,14 +11,9 @@ from pynvim_pp.api import (
     buf_set_option,
     create_buf,
     cur_buf,
-    cur_tab,
     cur_win,
-    list_bufs,
-    list_wins,
     set_cur_win,
-    tab_list_wins,
     win_get_buf,
-    win_get_option,
     win_set_option,
 )
 from pynvim_pp.hold import hold_win_pos
@@ -27,11 +22,29 @@ from pynvim_pp.lib import resolve_path
 
 from ...consts import FM_FILETYPE
 from ...fs.ops import ancestors
+from ...nvim.layout import invalidate_layout, layout
+from ...nvim.types import BufInfo, WinInfo
 from ...settings.types import Settings
 
 
+def _buf_filetype(nvim: Nvim, buf: Buffer) -> str:
+    info = layout(nvim).buffers.get(buf)
+    return info.filetype if info else buf_filetype(nvim, buf=buf)
+
+
+def _buf_name(nvim: Nvim, buf: Buffer) -> str:
+    info = layout(nvim).buffers.get(buf)
+    return info.name if info else buf_name(nvim, buf=buf)
+
+
+def _listed_bufs(nvim: Nvim) -> Iterator[BufInfo]:
+    for info in layout(nvim).buffers.values():
+        if info.listed:
+            yield info
+
+
 def is_fm_buffer(nvim: Nvim, buf: Buffer) -> bool:
-    ft = buf_filetype(nvim, buf=buf)
+    ft = _buf_filetype(nvim, buf=buf)
     return ft == FM_FILETYPE
 
 
@@ -40,79 +53,78 @@ def is_fm_window(nvim: Nvim, win: Window) -> bool:
     return is_fm_buffer(nvim, buf=buf)
 
 
-def find_windows_in_tab(
+def _windows_in_tab(
     nvim: Nvim, last_used: Mapping[int, None], no_secondary: bool
-) -> Iterator[Window]:
+) -> Iterator[WinInfo]:
     ordering = {win_id: idx for idx, win_id in enumerate(reversed(last_used))}
 
-    def key_by(win: Window) -> Tuple[float, int, int]:
+    def key_by(info: WinInfo) -> Tuple[float, int, int]:
         """
         -> sort by last_used, then row, then col
         """
 
-        pos = ordering.get(win.handle, inf)
-        row, col = nvim.funcs.win_screenpos(win.number)
-        return pos, col, row
+        pos = ordering.get(info.win.handle, inf)
+        return pos, info.col, info.row
 
-    tab = cur_tab(nvim)
-    wins = tab_list_wins(nvim, tab=tab)
+    snapshot = layout(nvim)
+    wins = (info for info in snapshot.windows if info.tab == snapshot.tab)
     ordered = sorted(wins, key=key_by)
 
-    for win in ordered:
-        is_preview: bool = win_get_option(nvim, win=win, key="previewwindow")
-        buf = win_get_buf(nvim, win)
-        ft = buf_filetype(nvim, buf=buf)
-        is_secondary = is_preview or ft == "qf"
+    for info in ordered:
+        ft = _buf_filetype(nvim, buf=info.buf)
+        is_secondary = info.preview or ft == "qf"
         if not is_secondary or not no_secondary:
-            yield win
+            yield info
+
+
+def find_windows_in_tab(
+    nvim: Nvim, last_used: Mapping[int, None], no_secondary: bool
+) -> Iterator[Window]:
+    for info in _windows_in_tab(nvim, last_used=last_used, no_secondary=no_secondary):
+        yield info.win
 
 
 def find_fm_windows(nvim: Nvim) -> Iterator[Tuple[Window, Buffer]]:
-    for win in list_wins(nvim):
-        buf = win_get_buf(nvim, win=win)
-        if is_fm_buffer(nvim, buf=buf):
-            yield win, buf
+    for info in layout(nvim).windows:
+        if is_fm_buffer(nvim, buf=info.buf):
+            yield info.win, info.buf
 
 
 def find_fm_windows_in_tab(
     nvim: Nvim, last_used: Mapping[int, None]
 ) -> Iterator[Window]:
-    for win in find_windows_in_tab(nvim, last_used=last_used, no_secondary=True):
-        buf = win_get_buf(nvim, win=win)
-        if is_fm_buffer(nvim, buf=buf):
-            yield win
+    for info in _windows_in_tab(nvim, last_used=last_used, no_secondary=True):
+        if is_fm_buffer(nvim, buf=info.buf):
+            yield info.win
 
 
 def find_non_fm_windows_in_tab(
     nvim: Nvim, last_used: Mapping[int, None]
 ) -> Iterator[Window]:
-    for win in find_windows_in_tab(nvim, last_used=last_used, no_secondary=True):
-        buf = win_get_buf(nvim, win=win)
-        if not is_fm_buffer(nvim, buf=buf):
-            yield win
+    for info in _windows_in_tab(nvim, last_used=last_used, no_secondary=True):
+        if not is_fm_buffer(nvim, buf=info.buf):
+            yield info.win
 
 
 def find_window_with_file_in_tab(
     nvim: Nvim, last_used: Mapping[int, None], file: PurePath
 ) -> Iterator[Window]:
-    for win in find_windows_in_tab(nvim, last_used=last_used, no_secondary=True):
-        buf = win_get_buf(nvim, win=win)
-        name = PurePath(buf_name(nvim, buf=buf))
+    for info in _windows_in_tab(nvim, last_used=last_used, no_secondary=True):
+        name = PurePath(_buf_name(nvim, buf=info.buf))
         if name == file:
-            yield win
+            yield info.win
 
 
 def find_fm_buffers(nvim: Nvim) -> Iterator[Buffer]:
-    for buf in list_bufs(nvim, listed=True):
-        if is_fm_buffer(nvim, buf=buf):
-            yield buf
+    for info in _listed_bufs(nvim):
+        if info.filetype == FM_FILETYPE:
+            yield info.buf
 
 
 def find_buffers_with_file(nvim: Nvim, file: PurePath) -> Iterator[Buffer]:
-    for buf in list_bufs(nvim, listed=True):
-        name = PurePath(buf_name(nvim, buf=buf))
-        if name == file:
-            yield buf
+    for info in _listed_bufs(nvim):
+        if PurePath(info.name) == file:
+            yield info.buf
 
 
 def find_current_buffer_path(nvim: Nvim) -> Optional[PurePath]:
@@ -144,6 +156,7 @@ def new_fm_buffer(nvim: Nvim, settings: Settings) -> Buffer:
             )
 
     km.drain(buf=buf).commit(nvim)
+    invalidate_layout()
     return buf
 
 
@@ -165,6 +178,7 @@ def new_window(
     set_cur_win(nvim, win=focus_win)
     nvim.command(f"{width}vnew" if width else "vnew")
     nvim.options["splitright"] = split_r
+    invalidate_layout()
 
     win = cur_win(nvim)
     buf = win_get_buf(nvim, win)
@@ -187,18 +201,17 @@ def kill_buffers(
 ) -> None:
     active = (
         {
-            win_get_buf(nvim, win=win): win
-            for win in find_non_fm_windows_in_tab(
-                nvim,
-                last_used=last_used,
-            )
+            info.buf: info.win
+            for info in _windows_in_tab(nvim, last_used=last_used, no_secondary=True)
+            if not is_fm_buffer(nvim, buf=info.buf)
         }
         if reopen
         else {}
     )
 
-    for buf in list_bufs(nvim, listed=True):
-        name = PurePath(buf_name(nvim, buf=buf))
+    for info in tuple(_listed_bufs(nvim)):
+        buf = info.buf
+        name = PurePath(info.name)
         buf_paths = ancestors(name) | {name}
 
         if not buf_paths.isdisjoint(paths):
@@ -213,3 +226,5 @@ def kill_buffers(
                     nvim.command(f"edit! {escaped}")
                     p.unlink(missing_ok=True)
             buf_close(nvim, buf=buf)
+
+    invalidate_layout()
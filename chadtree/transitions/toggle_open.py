@@ -9,7 +9,6 @@ from pynvim.api import Window
 from pynvim_pp.api import (
     cur_win,
     get_cwd,
-    list_wins,
     set_cur_win,
     win_close,
     win_set_buf,
@@ -19,6 +18,7 @@ from pynvim_pp.lib import write
 from std2.argparse import ArgparseError, ArgParser
 
 from ..fs.ops import exists, new
+from ..nvim.layout import invalidate_layout, layout
 from ..registry import rpc
 from ..settings.localization import LANG
 from ..settings.types import Settings
@@ -87,6 +87,7 @@ def _ensure_side_window(
             nvim.api.command("wincmd H")
         else:
             nvim.api.command("wincmd L")
+        invalidate_layout()
         resize_fm_windows(nvim, last_used=window_order, width=width)
 
 
@@ -101,9 +102,10 @@ def _open_fm_window(
     win = next(find_fm_windows_in_tab(nvim, last_used=window_order), None)
     if win:
         if opts.toggle:
-            wins = list_wins(nvim)
+            wins = layout(nvim).windows
             if len(wins) > 1:
                 win_close(nvim, win=win)
+                invalidate_layout()
         else:
             set_cur_win(nvim, win=win)
     else:
@@ -121,6 +123,7 @@ def _open_fm_window(
         for key, val in settings.win_local_opts.items():
             win_set_option(nvim, win=win, key=key, val=val)
         win_set_buf(nvim, win=win, buf=buf)
+        invalidate_layout()
 
         _ensure_side_window(
             nvim, window=win, settings=settings, window_order=window_order, width=width
@@ -162,7 +165,7 @@ def _open(
         if opts.path:
             path = opts.path if opts.path.is_absolute() else get_cwd(nvim) / opts.path
             if not exists(path, follow=True):
-                new(state.pool, paths=(path,))
+                new(state.io, paths=(path,))
             next_state = (
                 maybe_path_above(nvim, state=new_state, settings=settings, path=path)
                 or new_state
@@ -1,9 +1,11 @@
-from typing import Optional, Union
+from pathlib import PurePath
+from typing import Iterator, Optional, Union
 
 from pynvim import Nvim
 from pynvim_pp.lib import write
 from std2.types import Void, VoidType
 
+from ..fs.types import Node
 from ..registry import rpc
 from ..settings.localization import LANG
 from ..settings.types import Settings
@@ -14,6 +16,13 @@ from .shared.index import indices
 from .types import Stage
 
 
+def _truncated(node: Node) -> Iterator[PurePath]:
+    if node.truncated:
+        yield node.path
+    for child in node.children.values():
+        yield from _truncated(child)
+
+
 @rpc(blocking=False)
 def _toggle_hidden(
     nvim: Nvim, state: State, settings: Settings, is_visual: bool
@@ -22,15 +31,20 @@ def _toggle_hidden(
     Toggle hidden
     """
 
-    node = next(indices(nvim, state=state, is_visual=is_visual))
+    node = next(indices(nvim, state=state, is_visual=is_visual), None)
     if not node:
         return None
     else:
         focus = node.path
         show_hidden = not state.show_hidden
         selection: Selection = state.selection if show_hidden else set()
+        # pages only count what is shown, cut off folders need a new page
         new_state = forward(
-            state, settings=settings, show_hidden=show_hidden, selection=selection
+            state,
+            settings=settings,
+            show_hidden=show_hidden,
+            selection=selection,
+            paths={*_truncated(state.root)},
         )
         return Stage(new_state, focus=focus)
 
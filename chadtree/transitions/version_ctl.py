@@ -1,5 +1,6 @@
 from pathlib import PurePath
 from threading import Lock
+from typing import MutableSet, Optional, Tuple
 
 from pynvim import Nvim
 from pynvim_pp.api import get_cwd
@@ -8,12 +9,14 @@ from pynvim_pp.logging import log
 from ..registry import enqueue_event, rpc
 from ..settings.types import Settings
 from ..state.next import forward
+from ..state.ops import dump_vc, load_vc
 from ..state.types import State
-from ..version_ctl.git import status
+from ..version_ctl.git import repo_fingerprint, status
 from ..version_ctl.types import VCStatus
 from .types import Stage
 
 _lock = Lock()
+_checked: MutableSet[PurePath] = set()
 
 
 @rpc(blocking=False)
@@ -22,6 +25,20 @@ def _set_vc(nvim: Nvim, state: State, settings: Settings, vc: VCStatus) -> Stage
     return Stage(new_state)
 
 
+def _check_cached(
+    cwd: PurePath, state: State, fingerprint: Optional[Tuple[PurePath, str]]
+) -> None:
+    """
+    The status loaded at startup goes right away if HEAD / the index moved,
+    rather than staying up until `git status` is done
+    """
+
+    if cached := load_vc(cwd, session_store=state.session_store):
+        fp, _ = cached
+        if not fingerprint or fingerprint[1] != fp:
+            enqueue_event(_set_vc, VCStatus())
+
+
 @rpc(blocking=False)
 def vc_refresh(nvim: Nvim, state: State, settings: Settings) -> None:
     """
@@ -37,10 +54,30 @@ def vc_refresh(nvim: Nvim, state: State, settings: Settings) -> None:
             else:
                 with _lock:
                     try:
-                        vc = status(state.pool, cwd=cwd)
+                        fingerprint = repo_fingerprint(cwd)
+                        if cwd not in _checked:
+                            _checked.add(cwd)
+                            _check_cached(cwd, state=state, fingerprint=fingerprint)
+                        vc = status(
+                            state.io,
+                            cwd=cwd,
+                            expanded=state.index,
+                            fast_index=settings.version_ctl.fast_index,
+                        )
                     except Exception as e:
                         log.exception("%s", e)
                     else:
                         enqueue_event(_set_vc, vc)
+                        if fingerprint:
+                            _, fp = fingerprint
+                            try:
+                                dump_vc(
+                                    cwd,
+                                    fingerprint=fp,
+                                    vc=vc,
+                                    session_store=state.session_store,
+                                )
+                            except OSError as e:
+                                log.warn("%s", e)
 
-        state.pool.submit(cont)
+        state.background.submit(vc_refresh.name, cont)
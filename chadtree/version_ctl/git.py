@@ -1,26 +1,30 @@
 from concurrent.futures import Executor, Future, wait
-from itertools import chain
+from dataclasses import dataclass
+from itertools import chain, takewhile
 from locale import strxfrm
-from os import environ, linesep
-from pathlib import PurePath
+from os import environ, linesep, listdir, stat
+from pathlib import Path, PurePath
 from shutil import which
 from string import whitespace
 from subprocess import DEVNULL, PIPE, CalledProcessError, check_output
 from typing import (
+    AbstractSet,
     Iterable,
     Iterator,
     MutableMapping,
     MutableSequence,
     MutableSet,
+    Optional,
     Sequence,
     Tuple,
     cast,
 )
 
-from std2.pathlib import ROOT
+from std2.pathlib import ROOT, is_relative_to
 from std2.string import removeprefix, removesuffix
 
-from ..fs.ops import ancestors
+from ..fs.ops import ancestors, exists, intern
+from .git_index import GitIndex, index_fingerprint, read_index, worktree_status
 from .types import VCStatus
 
 _WHITE_SPACES = {*whitespace}
@@ -33,6 +37,14 @@ _GIT_LIST_CMD = (
     "--porcelain",
     "-z",
 )
+_GIT_CONFIG_CMD = (
+    "git",
+    "--no-optional-locks",
+    "config",
+    "-z",
+    "--get-regexp",
+    r"^core\.(filemode|autocrlf|attributesfile)$",
+)
 _GIT_ENV = {"LC_ALL": "C"}
 
 _GIT_SUBMODULE_MARKER = "Entering "
@@ -40,18 +52,86 @@ _SUBMODULE_MARKER = "S"
 _IGNORED_MARKER = "I"
 _UNTRACKED_MARKER = "?"
 
+_GIT_DIR = ".git"
+_GIT_DIR_PREFIX = "gitdir:"
+_GIT_ATTRIBUTES = ".gitattributes"
+_FALSE = {"false", "no", "off", "0"}
+_HEAD_REF_PREFIX = "ref:"
+_UNTRACKED_STATS = {"??", "!!"}
+_UNRESOLVED = {"R", "C", "U"}
+
+_Stats = Sequence[Tuple[str, PurePath]]
+
+
+@dataclass(frozen=True)
+class _Config:
+    """
+    filters -> eol conversion / attributes that can apply clean filters are on
+    """
+
+    filemode: bool
+    filters: bool
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    fingerprint: str
+    config: _Config
+    main: _Stats
+    sub: _Stats
+
+
+_ROOTS: MutableMapping[PurePath, Tuple[PurePath, Tuple[int, int]]] = {}
+_INDICES: MutableMapping[PurePath, GitIndex] = {}
+_SNAPSHOTS: MutableMapping[PurePath, _Snapshot] = {}
+
+
+def _dot_git_id(top_level: PurePath) -> Optional[Tuple[int, int]]:
+    try:
+        info = stat(top_level / _GIT_DIR, follow_symlinks=False)
+    except OSError:
+        return None
+    else:
+        return info.st_dev, info.st_ino
+
+
+def _cached_root(cwd: PurePath) -> Optional[PurePath]:
+    """
+    Toplevel only moves when a `.git` appears / disappears between cwd and it
+    """
+
+    if cached := _ROOTS.get(cwd):
+        top_level, dot_git_id = cached
+        below = takewhile(lambda p: p != top_level, chain((cwd,), cwd.parents))
+        if _dot_git_id(top_level) == dot_git_id and not any(
+            exists(path / _GIT_DIR, follow=False) for path in below
+        ):
+            return top_level
+        else:
+            _ROOTS.pop(cwd, None)
+            return None
+    else:
+        return None
+
 
 def root(cwd: PurePath) -> PurePath:
-    stdout = check_output(
-        ("git", "--no-optional-locks", "rev-parse", "--show-toplevel"),
-        stderr=PIPE,
-        text=True,
-        cwd=cwd,
-    )
-    return PurePath(stdout.rstrip())
+    if cached := _cached_root(cwd):
+        return cached
+    else:
+        stdout = check_output(
+            ("git", "--no-optional-locks", "rev-parse", "--show-toplevel"),
+            stderr=PIPE,
+            text=True,
+            cwd=cwd,
+        )
+        top_level = PurePath(stdout.rstrip())
+        dot_git_id = _dot_git_id(top_level)
+        if dot_git_id and (cwd == top_level or is_relative_to(cwd, top_level)):
+            _ROOTS[cwd] = (top_level, dot_git_id)
+        return top_level
 
 
-def _stat_main(cwd: str) -> Sequence[Tuple[str, PurePath]]:
+def _stat_main(cwd: PurePath) -> _Stats:
     stdout = check_output(_GIT_LIST_CMD, stdin=DEVNULL, stderr=PIPE, text=True, cwd=cwd)
 
     def cont() -> Iterator[Tuple[str, PurePath]]:
@@ -66,7 +146,7 @@ def _stat_main(cwd: str) -> Sequence[Tuple[str, PurePath]]:
     return tuple(cont())
 
 
-def _stat_sub_modules(cwd: PurePath) -> Sequence[Tuple[str, PurePath]]:
+def _stat_sub_modules(cwd: PurePath) -> _Stats:
     stdout = check_output(
         (
             "git",
@@ -137,7 +217,7 @@ def _parse(root: PurePath, stats: Iterable[Tuple[str, PurePath]]) -> VCStatus:
     directories: MutableMapping[PurePath, MutableSet[str]] = {}
 
     for stat, name in stats:
-        path = root / name
+        path = intern(root / name)
         status[path] = _stat_name(stat)
         if "!" in stat:
             ignored.add(path)
@@ -158,15 +238,266 @@ def _parse(root: PurePath, stats: Iterable[Tuple[str, PurePath]]) -> VCStatus:
     return VCStatus(ignored=ignored, status=trimmed)
 
 
-def status(pool: Executor, cwd: PurePath) -> VCStatus:
+def _git_dir(top_level: PurePath) -> Optional[Path]:
+    dot_git = Path(top_level) / _GIT_DIR
+    if dot_git.is_dir():
+        return dot_git
+    elif dot_git.is_file():
+        line = dot_git.read_text("UTF-8").strip()
+        if line.startswith(_GIT_DIR_PREFIX):
+            git_dir = Path(removeprefix(line, prefix=_GIT_DIR_PREFIX).strip())
+            return git_dir if git_dir.is_absolute() else Path(top_level) / git_dir
+        else:
+            return None
+    else:
+        return None
+
+
+def _common_dir(git_dir: Path) -> Path:
+    """
+    Linked worktrees keep `HEAD` + `index` to themselves, refs and config are in
+    the main repo's git dir
+    """
+
+    try:
+        line = (git_dir / "commondir").read_text("UTF-8").strip()
+    except FileNotFoundError:
+        return git_dir
+    else:
+        common = Path(line)
+        return common if common.is_absolute() else git_dir / common
+
+
+def _fingerprint(git_dir: Path) -> str:
+    """
+    Anything that can move staged state without touching the worktree
+    """
+
+    common = _common_dir(git_dir)
+    head = (git_dir / "HEAD").read_text("UTF-8").strip()
+    ref = removeprefix(head, prefix=_HEAD_REF_PREFIX).strip()
+    refs = (
+        (git_dir / ref, common / ref, common / "packed-refs")
+        if head.startswith(_HEAD_REF_PREFIX)
+        else ()
+    )
+    configs = (common / "config", git_dir / "config.worktree")
+    stats = tuple(
+        (str(p), p.stat().st_mtime_ns) for p in (*refs, *configs) if p.exists()
+    )
+    index = git_dir / "index"
+    idx = index_fingerprint(index) if index.exists() else None
+    return str((head, stats, idx))
+
+
+def _config(cwd: PurePath, git_dir: Path) -> _Config:
+    try:
+        stdout = check_output(
+            _GIT_CONFIG_CMD,
+            env={**environ, **_GIT_ENV},
+            stdin=DEVNULL,
+            stderr=DEVNULL,
+            text=True,
+            cwd=cwd,
+        )
+    except CalledProcessError:
+        stdout = ""
+
+    config: MutableMapping[str, str] = {}
+    for item in stdout.split("\0"):
+        key, _, value = item.partition("\n")
+        if key:
+            config[key.lower()] = value.strip().lower()
+
+    config_home = environ.get("XDG_CONFIG_HOME") or str(Path.home() / ".config")
+    attributes = (
+        "core.attributesfile" in config
+        or (_common_dir(git_dir) / "info" / "attributes").exists()
+        or (Path(config_home) / "git" / "attributes").exists()
+    )
+    return _Config(
+        filemode=config.get("core.filemode") not in _FALSE,
+        filters=attributes or config.get("core.autocrlf", "false") not in _FALSE,
+    )
+
+
+def _attributes(top_level: PurePath, directory: PurePath) -> bool:
+    """
+    `.gitattributes` anywhere from `directory` up to the top level
+    """
+
+    return any(
+        exists(path / _GIT_ATTRIBUTES, follow=True)
+        for path in takewhile(
+            lambda p: p == top_level or is_relative_to(p, top_level),
+            chain((directory,), directory.parents),
+        )
+    )
+
+
+def _load_index(git_dir: Path) -> GitIndex:
+    path = git_dir / "index"
+    cached = _INDICES.get(path)
+    if cached and cached.fingerprint == index_fingerprint(path):
+        return cached
+    else:
+        index = read_index(path)
+        _INDICES[path] = index
+        return index
+
+
+def _overlay(
+    top_level: PurePath,
+    git_dir: Path,
+    snapshot: _Snapshot,
+    expanded: AbstractSet[PurePath],
+) -> Optional[_Stats]:
+    """
+    Re-derive worktree status for files in expanded folders from `.git/index`
+
+    -> None if anything needs `git status` to resolve (new files, conflicts, renames)
+    """
+
+    index = _load_index(git_dir)
+    racy_after, _, _ = index.fingerprint
+
+    stats: MutableMapping[PurePath, str] = {
+        name: prefix for prefix, name in snapshot.main
+    }
+    untracked = {
+        top_level / name
+        for prefix, name in snapshot.main
+        if prefix in _UNTRACKED_STATS
+    }
+
+    for directory in expanded:
+        if directory == top_level or is_relative_to(directory, top_level):
+            rel_dir = directory.relative_to(top_level)
+            if rel_dir.parts[:1] == (_GIT_DIR,):
+                continue
+
+            entries = index.entries.get(rel_dir, ())
+            tracked = {name for name, _ in entries}
+            filtered = snapshot.config.filters or _attributes(top_level, directory)
+
+            for name, entry in entries:
+                rel = rel_dir / name
+                prev = stats.get(rel, "  ")
+                if not _UNRESOLVED.isdisjoint(prev):
+                    return None
+                else:
+                    worktree = worktree_status(
+                        top_level / rel,
+                        entry=entry,
+                        racy_after=racy_after,
+                        filemode=snapshot.config.filemode,
+                        filtered=filtered,
+                    )
+                    if worktree is None:
+                        return None
+                    else:
+                        prefix = prev[:1] + worktree
+                        if prefix.isspace():
+                            stats.pop(rel, None)
+                        else:
+                            stats[rel] = prefix
+
+            try:
+                listing = {*listdir(directory)}
+            except (FileNotFoundError, NotADirectoryError):
+                listing = set()
+
+            for name in listing - tracked - {_GIT_DIR}:
+                rel = rel_dir / name
+                path = top_level / rel
+                if rel in index.directories:
+                    pass
+                elif path in untracked or not untracked.isdisjoint(ancestors(path)):
+                    pass
+                else:
+                    return None
+
+            for path in untracked:
+                if path.parent == directory and path.name not in listing:
+                    stats.pop(path.relative_to(top_level), None)
+
+    return tuple((prefix, name) for name, prefix in stats.items())
+
+
+def _full_status(pool: Executor, cwd: PurePath) -> Tuple[_Stats, _Stats]:
+    s_main = pool.submit(_stat_main, cwd=cwd)
+    s_sub = pool.submit(_stat_sub_modules, cwd=cwd)
+    wait(cast(Sequence[Future], (s_main, s_sub)))
+    return s_main.result(), s_sub.result()
+
+
+def _fast_status(
+    pool: Executor, cwd: PurePath, expanded: AbstractSet[PurePath]
+) -> VCStatus:
+    top_level = root(cwd)
+    git_dir = _git_dir(top_level)
+
+    if not git_dir:
+        main, sub = _full_status(pool, cwd=cwd)
+        return _parse(top_level, stats=chain(main, sub))
+    else:
+        fingerprint = _fingerprint(git_dir)
+        prev = _SNAPSHOTS.get(top_level)
+
+        try:
+            overlay = (
+                _overlay(top_level, git_dir=git_dir, snapshot=prev, expanded=expanded)
+                if prev and prev.fingerprint == fingerprint
+                else None
+            )
+        except (OSError, ValueError):
+            overlay = None
+
+        if prev and overlay is not None:
+            snapshot = _Snapshot(
+                fingerprint=fingerprint, config=prev.config, main=overlay, sub=prev.sub
+            )
+        else:
+            config = _config(cwd, git_dir=git_dir)
+            main, sub = _full_status(pool, cwd=cwd)
+            snapshot = _Snapshot(
+                fingerprint=fingerprint, config=config, main=main, sub=sub
+            )
+
+        _SNAPSHOTS[top_level] = snapshot
+        return _parse(top_level, stats=chain(snapshot.main, snapshot.sub))
+
+
+def repo_fingerprint(cwd: PurePath) -> Optional[Tuple[PurePath, str]]:
+    """
+    -> (toplevel, HEAD + index fingerprint)
+    """
+
     if which("git"):
         try:
-            r = pool.submit(root, cwd=cwd)
-            s_main = pool.submit(_stat_main, cwd=cwd)
-            s_sub = pool.submit(_stat_sub_modules, cwd=cwd)
+            top_level = root(cwd)
+            git_dir = _git_dir(top_level)
+            return (top_level, _fingerprint(git_dir)) if git_dir else None
+        except (CalledProcessError, OSError):
+            return None
+    else:
+        return None
+
+
+def status(
+    pool: Executor, cwd: PurePath, expanded: AbstractSet[PurePath], fast_index: bool
+) -> VCStatus:
+    if which("git"):
+        try:
+            if fast_index:
+                return _fast_status(pool, cwd=cwd, expanded=expanded)
+            else:
+                r = pool.submit(root, cwd=cwd)
+                s_main = pool.submit(_stat_main, cwd=cwd)
+                s_sub = pool.submit(_stat_sub_modules, cwd=cwd)
 
-            wait(cast(Sequence[Future], (r, s_main, s_sub)))
-            return _parse(r.result(), stats=chain(s_main.result(), s_sub.result()))
+                wait(cast(Sequence[Future], (r, s_main, s_sub)))
+                return _parse(r.result(), stats=chain(s_main.result(), s_sub.result()))
         except CalledProcessError:
             return VCStatus()
     else:
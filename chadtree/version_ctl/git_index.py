@@ -0,0 +1,195 @@
+from dataclasses import dataclass
+from hashlib import sha1
+from os import readlink, stat
+from pathlib import Path, PurePath
+from stat import S_ISLNK, S_IXUSR
+from struct import Struct
+from typing import Iterator, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+_HEADER = Struct(">4sII")
+_ENTRY = Struct(">IIIIIIIIII20sH")
+_EXTENDED = Struct(">H")
+
+_SIGNATURE = b"DIRC"
+_VERSIONS = {2, 3, 4}
+_EXTENDED_FLAG = 0x4000
+_STAGE_SHIFT = 12
+_STAGE_MASK = 0x3
+_U32 = 0xFFFFFFFF
+_NS = 10 ** 9
+
+_LINK_MODE = 0o120000
+_GITLINK_MODE = 0o160000
+
+CLEAN = " "
+MODIFIED = "M"
+DELETED = "D"
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    mtime_s: int
+    mtime_ns: int
+    size: int
+    mode: int
+    sha: bytes
+    stage: int
+
+
+@dataclass(frozen=True)
+class GitIndex:
+    fingerprint: Tuple[int, int, int]
+    entries: Mapping[PurePath, Sequence[Tuple[str, IndexEntry]]]
+    directories: Mapping[PurePath, None]
+
+
+def index_fingerprint(path: PurePath) -> Tuple[int, int, int]:
+    info = stat(path)
+    return info.st_mtime_ns, info.st_size, info.st_ino
+
+
+def _varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """
+    v4 path prefix compression, same offset encoding as `varint.c`
+    """
+
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
+
+
+def _parse(data: bytes) -> Iterator[Tuple[str, IndexEntry]]:
+    signature, version, count = _HEADER.unpack_from(data, 0)
+    if signature != _SIGNATURE or version not in _VERSIONS:
+        raise ValueError(signature, version)
+    else:
+        offset = _HEADER.size
+        prev = b""
+
+        for _ in range(count):
+            begin = offset
+            (
+                _,
+                _,
+                mtime_s,
+                mtime_ns,
+                _,
+                _,
+                mode,
+                _,
+                _,
+                size,
+                sha,
+                flags,
+            ) = _ENTRY.unpack_from(data, offset)
+            offset += _ENTRY.size
+
+            if version >= 3 and flags & _EXTENDED_FLAG:
+                offset += _EXTENDED.size
+
+            if version >= 4:
+                strip, offset = _varint(data, offset)
+                end = data.index(b"\0", offset)
+                name = prev[: len(prev) - strip] + data[offset:end]
+                offset = end + 1
+            else:
+                end = data.index(b"\0", offset)
+                name = data[offset:end]
+                offset = begin + ((end - begin) // 8 + 1) * 8
+
+            prev = name
+            entry = IndexEntry(
+                mtime_s=mtime_s,
+                mtime_ns=mtime_ns,
+                size=size,
+                mode=mode,
+                sha=sha,
+                stage=(flags >> _STAGE_SHIFT) & _STAGE_MASK,
+            )
+            yield name.decode("UTF-8", "surrogateescape"), entry
+
+
+def read_index(path: PurePath) -> GitIndex:
+    """
+    Parse `.git/index` (v2 - v4), entries are grouped by parent directory
+    """
+
+    fingerprint = index_fingerprint(path)
+    data = Path(path).read_bytes()
+
+    entries: MutableMapping[PurePath, MutableMapping[str, IndexEntry]] = {}
+    directories: MutableMapping[PurePath, None] = {}
+    for name, entry in _parse(data):
+        rel = PurePath(name)
+        siblings = entries.setdefault(rel.parent, {})
+        siblings[rel.name] = entry
+        for parent in rel.parents:
+            if parent in directories:
+                break
+            else:
+                directories[parent] = None
+
+    grouped = {
+        parent: tuple(children.items()) for parent, children in entries.items()
+    }
+    return GitIndex(fingerprint=fingerprint, entries=grouped, directories=directories)
+
+
+def _blob_sha(path: PurePath, is_link: bool) -> bytes:
+    data = readlink(path).encode("UTF-8") if is_link else Path(path).read_bytes()
+    return sha1(b"blob %d\0" % len(data) + data).digest()
+
+
+def worktree_status(
+    path: PurePath, entry: IndexEntry, racy_after: int, filemode: bool, filtered: bool
+) -> Optional[str]:
+    """
+    Same stat comparison as `git status`, re-hashing only when stat data is inconclusive
+
+    filemode -> `core.fileMode`, the exec bit counts as a change
+    filtered -> content may go through eol / clean filters before it is hashed
+
+    -> None when this needs a real `git status`
+    """
+
+    if entry.stage or entry.mode == _GITLINK_MODE:
+        return None
+    else:
+        try:
+            info = stat(path, follow_symlinks=False)
+        except (FileNotFoundError, NotADirectoryError):
+            return DELETED
+        else:
+            is_link = S_ISLNK(info.st_mode)
+            if is_link != (entry.mode == _LINK_MODE):
+                return MODIFIED
+            elif info.st_size & _U32 != entry.size:
+                return MODIFIED
+            elif (
+                filemode
+                and not is_link
+                and bool(info.st_mode & S_IXUSR) != bool(entry.mode & S_IXUSR)
+            ):
+                return MODIFIED
+            else:
+                secs, nanos = divmod(info.st_mtime_ns, _NS)
+                same_time = secs & _U32 == entry.mtime_s and (
+                    not entry.mtime_ns or nanos == entry.mtime_ns
+                )
+                if same_time and info.st_mtime_ns < racy_after:
+                    return CLEAN
+                else:
+                    try:
+                        sha = _blob_sha(path, is_link=is_link)
+                    except OSError:
+                        return None
+                    else:
+                        if sha == entry.sha:
+                            return CLEAN
+                        else:
+                            return None if filtered else MODIFIED
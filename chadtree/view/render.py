@@ -1,15 +1,23 @@
-from enum import IntEnum, auto
 from fnmatch import fnmatch
-from locale import strxfrm
 from os.path import sep
 from pathlib import PurePath
-from typing import Any, Callable, Iterator, Optional, Sequence, Tuple, cast
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
 
 from pynvim_pp.lib import encode
-from std2.types import never
 
-from ..fs.cartographer import is_dir, user_ignored
+from ..fs.cartographer import is_dir, sort_key, user_ignored
+from ..fs.search import cached
 from ..fs.types import Mode, Node
+from ..settings.localization import LANG
 from ..settings.types import Settings
 from ..state.types import FilterPattern, Index, Markers, Selection
 from ..version_ctl.types import VCStatus
@@ -17,29 +25,15 @@ from .ops import encode_for_display
 from .types import Badge, Derived, Highlight, Sortby
 
 
-class _CompVals(IntEnum):
-    FOLDER = auto()
-    FILE = auto()
-
-
 _Render = Tuple[str, Sequence[Highlight], Sequence[Badge]]
 _NRender = Tuple[Node, str, Sequence[Highlight], Sequence[Badge]]
 
 
 def _gen_comp(sortby: Sequence[Sortby]) -> Callable[[Node], Any]:
-    def comp(node: Node) -> Sequence[Any]:
-        def cont() -> Iterator[Any]:
-            for sb in sortby:
-                if sb is Sortby.is_folder:
-                    yield _CompVals.FOLDER if is_dir(node) else _CompVals.FILE
-                elif sb is Sortby.ext:
-                    yield "" if is_dir(node) else strxfrm(node.path.suffix)
-                elif sb is Sortby.file_name:
-                    yield strxfrm(node.path.name)
-                else:
-                    never(sb)
-
-        return tuple(cont())
+    key = sort_key(sortby)
+
+    def comp(node: Node) -> Tuple[Any, ...]:
+        return key(node.path.name, is_dir(node))
 
     return comp
 
@@ -220,14 +214,24 @@ def render(
         current=current,
     )
     comp = _gen_comp(settings.view.sort_by)
+    match = cached(filter_pattern.matcher) if filter_pattern else None
     keep_open = {node.path}
+    placeholder_group = settings.view.hl_context.particular_mappings.ignored
+
+    def placeholder(node: Node, depth: int, text: str) -> _NRender:
+        """
+        Stand-in for children of a folder that are still being walked / paged out
+        """
+
+        pre = _gen_spacer(depth + 1) + "   "
+        line = f"{pre}{text}"
+        begin = len(encode(pre))
+        end = begin + len(encode(text))
+        hl = Highlight(group=placeholder_group, begin=begin, end=end)
+        return node, line, (hl,), ()
 
     def render(node: Node, *, depth: int, cleared: bool) -> Iterator[_NRender]:
-        clear = (
-            cleared
-            or not filter_pattern
-            or fnmatch(node.path.name, filter_pattern.pattern)
-        )
+        clear = cleared or not match or match(node.path.name)
 
         if rend := show(node, depth):
 
@@ -236,9 +240,15 @@ def render(
                     yield from render(child, depth=depth + 1, cleared=clear)
 
             children = tuple(gen_children())
-            if clear or children or node.path in keep_open:
+            shown = clear or children or node.path in keep_open
+            if shown:
                 yield (node, *rend)
+                if node.pending:
+                    yield placeholder(node, depth=depth, text=LANG("loading"))
             yield from iter(children)
+            if shown and node.truncated and node.path in index:
+                more = LANG("more_entries", count=node.truncated)
+                yield placeholder(node, depth=depth, text=more)
 
     rendered = render(node, depth=0, cleared=False)
     _nodes, _lines, _highlights, _badges = zip(*rendered)
@@ -249,7 +259,9 @@ def render(
         cast(Sequence[Sequence[Badge]], _badges),
     )
     hashed = tuple(str(hash(zipped)) for zipped in zip(lines, highlights, badges))
-    path_row_lookup = {node.path: idx for idx, node in enumerate(nodes)}
+    path_row_lookup: MutableMapping[PurePath, int] = {}
+    for idx, node in enumerate(nodes):
+        path_row_lookup.setdefault(node.path, idx)
     derived = Derived(
         lines=lines,
         highlights=highlights,
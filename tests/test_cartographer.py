@@ -0,0 +1,107 @@
+from concurrent.futures import ThreadPoolExecutor
+from os import makedirs
+from pathlib import PurePath
+from shutil import rmtree
+from tempfile import TemporaryDirectory
+from typing import Optional
+from unittest import TestCase
+
+from chadtree.fs.cartographer import new, sort_key, update
+from chadtree.fs.types import Ignored, Mode, Node, Paging
+from chadtree.state.trie import PathTrie
+from chadtree.view.types import Sortby
+
+_KEY = sort_key((Sortby.is_folder, Sortby.file_name))
+
+
+_DOTS = Ignored(name_exact=set(), name_glob=(".*",), path_glob=())
+
+
+def _paging(size: int = 0, ignores: Optional[Ignored] = None) -> Paging:
+    return Paging(size=size, pages={}, key=_KEY, ignores=ignores)
+
+
+class Walk(TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        self.root = PurePath(self._tmp.name)
+        makedirs(self.root / "a" / "b")
+        open(self.root / "a" / "b" / "f", "w").close()
+        self.pool = ThreadPoolExecutor()
+
+    def tearDown(self) -> None:
+        self.pool.shutdown()
+        self._tmp.cleanup()
+
+    def test_missing_expanded_folder(self) -> None:
+        a, gone = self.root / "a", self.root / "a" / "gone"
+        index = PathTrie({self.root, a, gone})
+        node = new(self.pool, root=self.root, index=index, paging=_paging())
+        self.assertEqual({*node.children[a].children}, {a / "b"})
+
+    def test_missing_root(self) -> None:
+        root = self.root / "gone"
+        node = new(self.pool, root=root, index=PathTrie({root}), paging=_paging())
+        self.assertEqual(node.path, root)
+        self.assertEqual(node.children, {})
+
+    def test_update_after_removing_expanded_folder(self) -> None:
+        a, b = self.root / "a", self.root / "a" / "b"
+        index = PathTrie({self.root, a, b})
+        node = new(self.pool, root=self.root, index=index, paging=_paging())
+        self.assertIn(b / "f", node.children[a].children[b].children)
+
+        rmtree(b)
+        node = update(
+            self.pool, root=node, index=index, paging=_paging(), paths={b}
+        )
+        self.assertNotIn(Mode.folder, node.children[a].children[b].mode)
+        self.assertEqual(node.children[a].children[b].children, {})
+
+    def test_update_after_removing_root(self) -> None:
+        a = self.root / "a"
+        index = PathTrie({a})
+        node = new(self.pool, root=a, index=index, paging=_paging())
+        rmtree(a)
+        node = update(self.pool, root=node, index=index, paging=_paging(), paths={a})
+        self.assertEqual(node.path, a)
+        self.assertEqual(node.children, {})
+
+
+class Page(TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        self.root = PurePath(self._tmp.name)
+        for name in (".a", ".b", "c", ".d", "e", "f", ".g"):
+            open(self.root / name, "w").close()
+        self.pool = ThreadPoolExecutor()
+
+    def tearDown(self) -> None:
+        self.pool.shutdown()
+        self._tmp.cleanup()
+
+    def _walk(self, paging: Paging) -> Node:
+        index = PathTrie({self.root})
+        return new(self.pool, root=self.root, index=index, paging=paging)
+
+    def test_no_limit(self) -> None:
+        node = self._walk(_paging(ignores=_DOTS))
+        self.assertEqual(len(node.children), 7)
+        self.assertEqual(node.truncated, 0)
+
+    def test_hidden_entries_are_not_counted(self) -> None:
+        node = self._walk(_paging(size=2, ignores=_DOTS))
+        names = {path.name for path in node.children}
+        self.assertEqual(names, {".a", ".b", "c", ".d", "e", ".g"})
+        self.assertEqual(node.truncated, 1)
+
+    def test_everything_visible_fits(self) -> None:
+        node = self._walk(_paging(size=3, ignores=_DOTS))
+        self.assertEqual(len(node.children), 7)
+        self.assertEqual(node.truncated, 0)
+
+    def test_shown_hidden_entries_are_counted(self) -> None:
+        node = self._walk(_paging(size=2))
+        names = {path.name for path in node.children}
+        self.assertEqual(names, {".a", ".b"})
+        self.assertEqual(node.truncated, 5)
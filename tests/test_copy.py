@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+from os import lstat, makedirs, mkfifo, readlink, symlink
+from pathlib import Path, PurePath
+from shutil import Error
+from socket import AF_UNIX, socket
+from stat import S_ISFIFO, S_ISLNK
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from chadtree.executors import Job
+from chadtree.fs.copy import copy_trees
+
+
+def _job() -> Job:
+    return Job("copy", on_progress=lambda: None, interval=0)
+
+
+class CopyTrees(TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        self.src = PurePath(self._tmp.name) / "src"
+        self.dst = PurePath(self._tmp.name) / "dst"
+        makedirs(self.src / "sub")
+        Path(self.src / "sub" / "f").write_text("f")
+        Path(self.src / "big").write_bytes(b"x" * 3_000_000)
+        self.pool = ThreadPoolExecutor()
+
+    def tearDown(self) -> None:
+        self.pool.shutdown()
+        self._tmp.cleanup()
+
+    def test_tree(self) -> None:
+        job = _job()
+        copy_trees(self.pool, operations={self.src: self.dst}, job=job)
+        self.assertEqual(Path(self.dst / "sub" / "f").read_text(), "f")
+        self.assertEqual(Path(self.dst / "big").stat().st_size, 3_000_000)
+        self.assertEqual(job.progress(), (2, 2, 3_000_001))
+
+    def test_links(self) -> None:
+        symlink("nowhere", self.src / "dangling")
+        symlink("sub/f", self.src / "alive")
+        copy_trees(self.pool, operations={self.src: self.dst}, job=_job())
+        self.assertEqual(readlink(self.dst / "dangling"), "nowhere")
+        self.assertFalse(S_ISLNK(lstat(self.dst / "alive").st_mode))
+        self.assertEqual(Path(self.dst / "alive").read_text(), "f")
+
+    def test_special_files(self) -> None:
+        mkfifo(self.src / "fifo")
+        with socket(AF_UNIX) as sock:
+            sock.bind(str(self.src / "sock"))
+            copy_trees(self.pool, operations={self.src: self.dst}, job=_job())
+        self.assertTrue(S_ISFIFO(lstat(self.dst / "fifo").st_mode))
+        self.assertFalse(Path(self.dst / "sock").exists())
+
+    def test_errors_gathered(self) -> None:
+        makedirs(self.dst / "sub")
+        Path(self.dst / "sub" / "f").write_text("taken")
+        ops = {self.src / "sub": self.dst / "sub", self.src / "big": self.dst / "big"}
+        with self.assertRaises(Error) as ctx:
+            copy_trees(self.pool, operations=ops, job=_job())
+        failed = {src for src, _, _ in ctx.exception.args[0]}
+        self.assertEqual(failed, {str(self.src / "sub"), str(self.src / "sub" / "f")})
+        self.assertEqual(Path(self.dst / "sub" / "f").read_text(), "taken")
+        self.assertEqual(Path(self.dst / "big").stat().st_size, 3_000_000)
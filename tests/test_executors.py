@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from unittest import TestCase
+
+from chadtree.executors import Background, Cancelled, Job
+
+
+def _job() -> Job:
+    return Job("job", on_progress=lambda: None, interval=0)
+
+
+class JobCancel(TestCase):
+    def test_before_next_item(self) -> None:
+        job = _job()
+        job.add(2)
+        job.check()
+        job.advance()
+        job.cancel()
+        with self.assertRaises(Cancelled):
+            job.check()
+
+    def test_item_in_flight_still_counts(self) -> None:
+        job = _job()
+        job.add(2)
+        job.check()
+        job.cancel()
+        job.advance()
+        self.assertEqual(job.progress(), (1, 2, 0))
+
+    def test_after_last_item(self) -> None:
+        job = _job()
+        job.add(1)
+        job.check()
+        job.advance()
+        job.cancel()
+        job.check()
+        self.assertTrue(job.done())
+
+
+class BackgroundLane(TestCase):
+    def test_queued_job_replaced(self) -> None:
+        gate, ran = Event(), []
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            background = Background(pool)
+            background.submit("block", gate.wait)
+            first = background.submit("key", lambda: ran.append(1))
+            second = background.submit("key", lambda: ran.append(2))
+            gate.set()
+            second.result()
+        self.assertTrue(first.cancelled())
+        self.assertEqual(ran, [2])
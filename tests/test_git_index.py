@@ -0,0 +1,158 @@
+from concurrent.futures import ThreadPoolExecutor
+from os import chmod, environ, stat
+from pathlib import Path, PurePath
+from subprocess import DEVNULL, check_output
+from tempfile import TemporaryDirectory
+from typing import Mapping
+from unittest import TestCase
+
+from chadtree.version_ctl.git import _attributes, _config, _fingerprint, _git_dir
+from chadtree.version_ctl.git import status
+from chadtree.version_ctl.git_index import (
+    CLEAN,
+    MODIFIED,
+    IndexEntry,
+    read_index,
+    worktree_status,
+)
+
+_ENV = {
+    **environ,
+    "GIT_AUTHOR_NAME": "test",
+    "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "test",
+    "GIT_COMMITTER_EMAIL": "test@example.com",
+    "GIT_CONFIG_NOSYSTEM": "1",
+}
+
+
+def _git(cwd: PurePath, *args: str) -> str:
+    return check_output(("git", *args), cwd=cwd, env=_ENV, stdin=DEVNULL, text=True)
+
+
+class _Repo(TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        self.root = PurePath(self._tmp.name) / "repo"
+        Path(self.root / "sub").mkdir(parents=True)
+        Path(self.root / "a.txt").write_text("a\n")
+        Path(self.root / "sub" / "b.txt").write_text("b\n")
+        _git(self.root, "init", "-q")
+        _git(self.root, "config", "core.filemode", "true")
+        _git(self.root, "add", "-A")
+        _git(self.root, "commit", "-q", "-m", "init")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _entries(self) -> Mapping[PurePath, IndexEntry]:
+        index = read_index(self.root / ".git" / "index")
+        return {
+            parent / name: entry
+            for parent, children in index.entries.items()
+            for name, entry in children
+        }
+
+    def _status(self, rel: str, filemode: bool = True, filtered: bool = False) -> str:
+        entry = self._entries()[PurePath(rel)]
+        status = worktree_status(
+            self.root / rel,
+            entry=entry,
+            racy_after=0,
+            filemode=filemode,
+            filtered=filtered,
+        )
+        assert status is not None
+        return status
+
+
+class ReadIndex(_Repo):
+    def _check(self) -> None:
+        listed = _git(self.root, "ls-files", "-s").splitlines()
+        expected = {
+            PurePath(line.partition("\t")[2]): line.split()[1] for line in listed
+        }
+        entries = self._entries()
+        self.assertEqual({*entries}, {*expected})
+        for path, entry in entries.items():
+            self.assertEqual(entry.sha.hex(), expected[path])
+
+    def test_v2(self) -> None:
+        self._check()
+
+    def test_v4(self) -> None:
+        _git(self.root, "update-index", "--index-version", "4")
+        self._check()
+
+    def test_directories(self) -> None:
+        index = read_index(self.root / ".git" / "index")
+        self.assertEqual({*index.directories}, {PurePath("."), PurePath("sub")})
+
+
+class WorktreeStatus(_Repo):
+    def test_clean(self) -> None:
+        self.assertEqual(self._status("a.txt"), CLEAN)
+
+    def test_same_size_edit(self) -> None:
+        Path(self.root / "a.txt").write_text("z\n")
+        self.assertEqual(self._status("a.txt"), MODIFIED)
+
+    def test_exec_bit(self) -> None:
+        path = self.root / "a.txt"
+        chmod(path, stat(path).st_mode | 0o111)
+        self.assertEqual(self._status("a.txt"), MODIFIED)
+        self.assertEqual(self._status("a.txt", filemode=False), CLEAN)
+        self.assertEqual(_git(self.root, "status", "--porcelain"), " M a.txt\n")
+
+    def test_filtered_mismatch_needs_git(self) -> None:
+        Path(self.root / "a.txt").write_text("z\n")
+        entry = self._entries()[PurePath("a.txt")]
+        status = worktree_status(
+            self.root / "a.txt",
+            entry=entry,
+            racy_after=0,
+            filemode=True,
+            filtered=True,
+        )
+        self.assertIsNone(status)
+
+
+class Fingerprint(_Repo):
+    def test_linked_worktree_ref(self) -> None:
+        tree = PurePath(self._tmp.name) / "tree"
+        _git(self.root, "worktree", "add", "-q", "-b", "other", str(tree))
+        git_dir = _git_dir(tree)
+        assert git_dir
+        before = _fingerprint(git_dir)
+
+        _git(self.root, "commit", "-q", "--allow-empty", "-m", "empty")
+        _git(self.root, "update-ref", "refs/heads/other", "HEAD")
+        self.assertNotEqual(_fingerprint(git_dir), before)
+
+
+class Overlay(_Repo):
+    def _fast(self) -> Mapping[PurePath, str]:
+        with ThreadPoolExecutor() as pool:
+            vc = status(pool, cwd=self.root, expanded={self.root}, fast_index=True)
+        return vc.status
+
+    def test_exec_bit(self) -> None:
+        self.assertNotIn(self.root / "a.txt", self._fast())
+        path = self.root / "a.txt"
+        chmod(path, stat(path).st_mode | 0o111)
+        self.assertEqual(self._fast().get(self.root / "a.txt"), " M")
+
+    def test_config(self) -> None:
+        git_dir = _git_dir(self.root)
+        assert git_dir
+        self.assertEqual(_config(self.root, git_dir=git_dir).filters, False)
+        _git(self.root, "config", "core.autocrlf", "input")
+        self.assertEqual(_config(self.root, git_dir=git_dir).filters, True)
+        _git(self.root, "config", "core.filemode", "false")
+        self.assertEqual(_config(self.root, git_dir=git_dir).filemode, False)
+
+    def test_attributes(self) -> None:
+        sub = self.root / "sub"
+        self.assertFalse(_attributes(self.root, directory=sub))
+        Path(self.root / ".gitattributes").write_text("*.txt text\n")
+        self.assertTrue(_attributes(self.root, directory=sub))
@@ -0,0 +1,44 @@
+from os import makedirs
+from pathlib import PurePath
+from subprocess import DEVNULL, check_call
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from chadtree.fs.search import compile_matcher, index_project, search
+from chadtree.fs.types import Ignored
+
+_IGNORES = Ignored(name_exact={"vendor"}, name_glob=(), path_glob=())
+
+
+class IndexProject(TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        self.root = PurePath(self._tmp.name)
+        makedirs(self.root / "src")
+        makedirs(self.root / "vendor" / "lib")
+        for path in ("src/main.py", "vendor/lib/main.py", "vendor/main.py"):
+            open(self.root / path, "w").close()
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_walk_drops_ignored_folders(self) -> None:
+        project = index_project(self.root, ignores=_IGNORES, fingerprint=None)
+        self.assertEqual({*project.paths}, {"src", "src/main.py"})
+
+    def test_git_drops_everything_under_ignored_folders(self) -> None:
+        check_call(("git", "init", "-q"), cwd=self.root, stdout=DEVNULL)
+        project = index_project(self.root, ignores=_IGNORES, fingerprint="git")
+        self.assertEqual({*project.paths}, {"src", "src/main.py"})
+
+    def test_reused_while_fingerprint_holds(self) -> None:
+        first = index_project(self.root, ignores=_IGNORES, fingerprint="a")
+        again = index_project(self.root, ignores=_IGNORES, fingerprint="a")
+        moved = index_project(self.root, ignores=_IGNORES, fingerprint="b")
+        self.assertIs(first, again)
+        self.assertIsNot(first, moved)
+
+    def test_search(self) -> None:
+        project = index_project(self.root, ignores=_IGNORES, fingerprint=None)
+        hits = search(project, matcher=compile_matcher("main"), limit=10)
+        self.assertEqual({*hits}, {self.root / "src" / "main.py"})
@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+from os import O_RDONLY, close, listdir, makedirs
+from os import open as os_open
+from os.path import lexists
+from pathlib import Path, PurePath
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from chadtree.executors import Job
+from chadtree.fs.tombstone import _lock, _records, bury, reap
+
+
+def _job() -> Job:
+    return Job("delete", on_progress=lambda: None, interval=0)
+
+
+class Tombstones(TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        tmp = PurePath(self._tmp.name)
+        self.store = Path(tmp / "store")
+        self.root = tmp / "root"
+        makedirs(self.root / "d" / "e")
+        Path(self.root / "d" / "e" / "f").write_text("f")
+        Path(self.root / "g").write_text("g")
+        self.pool = ThreadPoolExecutor()
+
+    def tearDown(self) -> None:
+        self.pool.shutdown()
+        self._tmp.cleanup()
+
+    def _bury(self) -> None:
+        paths = (self.root / "d", self.root / "g")
+        bury(self.pool, store=self.store, paths=paths, job=_job())
+
+    def test_bury_then_reap(self) -> None:
+        self._bury()
+        self.assertEqual(listdir(self.root), [])
+        self.assertEqual(len(listdir(_records(self.store))), 2)
+
+        reap(self.store)
+        self.assertEqual(listdir(_records(self.store)), [])
+        graves = self.store / "tombstones" / "graves"
+        self.assertEqual(listdir(graves), [])
+
+    def test_locked_records_are_left_alone(self) -> None:
+        self._bury()
+        records = _records(self.store)
+        held, *_ = sorted(listdir(records))
+        fd = os_open(records / held, O_RDONLY)
+        try:
+            self.assertTrue(_lock(fd, block=False))
+            reap(self.store)
+            self.assertEqual(listdir(records), [held])
+        finally:
+            close(fd)
+
+        reap(self.store)
+        self.assertEqual(listdir(records), [])
+
+    def test_stale_record(self) -> None:
+        records = _records(self.store)
+        makedirs(records)
+        Path(records / "stale").write_text(str(self.root / "gone"))
+        reap(self.store)
+        self.assertFalse(lexists(records / "stale"))
@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+from os import environ, listdir, makedirs
+from pathlib import Path, PurePath
+from tempfile import TemporaryDirectory
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+from urllib.parse import quote
+
+from chadtree.executors import Job
+from chadtree.fs import trash as _trash
+from chadtree.fs.trash import directory_sizes, trash
+
+
+def _job() -> Job:
+    return Job("trash", on_progress=lambda: None, interval=0)
+
+
+@skipUnless(_trash._NATIVE, "freedesktop.org trash only")
+class Trash(TestCase):
+    def setUp(self) -> None:
+        self._tmp = TemporaryDirectory()
+        tmp = PurePath(self._tmp.name)
+        self.home = tmp / "data" / "Trash"
+        self.root = tmp / "root"
+        makedirs(self.root / "a" / "sub")
+        makedirs(self.root / "b")
+        Path(self.root / "a" / "sub" / "x").write_text("xyz")
+        Path(self.root / "b" / "x").write_text("x")
+        self._env = patch.dict(environ, {"XDG_DATA_HOME": str(tmp / "data")})
+        self._env.start()
+        _trash._TRASHES.clear()
+        self.pool = ThreadPoolExecutor()
+
+    def tearDown(self) -> None:
+        self.pool.shutdown()
+        self._env.stop()
+        _trash._TRASHES.clear()
+        self._tmp.cleanup()
+
+    def test_info(self) -> None:
+        path = self.root / "a"
+        trashed = trash(self.pool, paths=(path,), job=_job())
+        self.assertEqual(trashed.leftover, ())
+        self.assertEqual(trashed.folders, {self.home})
+        self.assertEqual(listdir(self.home / "files"), ["a"])
+
+        lines = Path(self.home / "info" / "a.trashinfo").read_text().splitlines()
+        self.assertEqual(lines[0], "[Trash Info]")
+        self.assertEqual(lines[1], f"Path={quote(str(path))}")
+        self.assertTrue(lines[2].startswith("DeletionDate="))
+
+    def test_same_name(self) -> None:
+        paths = (self.root / "a" / "sub" / "x", self.root / "b" / "x")
+        trash(self.pool, paths=paths, job=_job())
+        self.assertEqual(sorted(listdir(self.home / "files")), ["x", "x.2"])
+        self.assertEqual(
+            sorted(listdir(self.home / "info")), ["x.2.trashinfo", "x.trashinfo"]
+        )
+
+    def test_directory_sizes(self) -> None:
+        trash(self.pool, paths=(self.root / "a",), job=_job())
+        directory_sizes(self.home)
+        size, _, name = Path(self.home / "directorysizes").read_text().split()
+        self.assertEqual((size, name), ("3", "a"))
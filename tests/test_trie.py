@@ -0,0 +1,67 @@
+from pathlib import PurePath
+from pickle import dumps, loads
+from random import Random
+from typing import AbstractSet
+from unittest import TestCase
+
+from chadtree.state.trie import PathTrie
+
+_ROOT = PurePath("/r")
+
+
+def _paths(rng: Random, n: int) -> AbstractSet[PurePath]:
+    def cont() -> PurePath:
+        parts = (rng.choice("abc") for _ in range(rng.randint(0, 4)))
+        return _ROOT.joinpath(*parts)
+
+    return {cont() for _ in range(n)}
+
+
+class SetOps(TestCase):
+    def test_same_as_set(self) -> None:
+        rng = Random(0)
+        for _ in range(200):
+            a, b = _paths(rng, n=12), _paths(rng, n=12)
+            trie = PathTrie(a)
+            self.assertEqual(trie, a)
+            self.assertEqual(len(trie), len(a))
+            self.assertEqual(trie | b, a | b)
+            self.assertEqual(trie - b, a - b)
+            self.assertEqual(trie ^ b, a ^ b)
+            self.assertEqual(trie & b, a & b)
+            self.assertIsInstance(trie | b, PathTrie)
+            for path in _paths(rng, n=6):
+                self.assertEqual(path in trie, path in a)
+
+    def test_persistent(self) -> None:
+        a = PathTrie({_ROOT / "a", _ROOT / "b"})
+        b = a | {_ROOT / "c"}
+        self.assertEqual(a, {_ROOT / "a", _ROOT / "b"})
+        self.assertEqual(b, {_ROOT / "a", _ROOT / "b", _ROOT / "c"})
+
+    def test_not_a_path(self) -> None:
+        self.assertNotIn("/r/a", PathTrie({_ROOT / "a"}))
+
+    def test_pickle(self) -> None:
+        trie = PathTrie({_ROOT / "a" / "b", _ROOT})
+        self.assertEqual(loads(dumps(trie)), trie)
+
+
+class Subtrees(TestCase):
+    def setUp(self) -> None:
+        a, d = _ROOT / "a", _ROOT / "d"
+        self.trie = PathTrie({_ROOT, a, a / "b", a / "b" / "c", d})
+
+    def test_subtree(self) -> None:
+        self.assertEqual(
+            {*self.trie.subtree(_ROOT / "a" / "b")},
+            {_ROOT / "a" / "b", _ROOT / "a" / "b" / "c"},
+        )
+        self.assertEqual({*self.trie.subtree(_ROOT / "x")}, set())
+
+    def test_without_subtree(self) -> None:
+        self.assertEqual(self.trie.without_subtree(_ROOT / "a"), {_ROOT, _ROOT / "d"})
+
+    def test_prune(self) -> None:
+        pruned = self.trie.prune(lambda path: path.name != "b")
+        self.assertEqual(pruned, {_ROOT, _ROOT / "a", _ROOT / "d"})